@@ -0,0 +1,51 @@
+"""Compares two results files produced by `suite.py`, e.g. before and
+after some change, and fails if anything got slower than a threshold.
+
+Usage:
+	python benchmarks/compare.py before.json after.json --threshold 0.2
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+def duration(result:dict)->float:
+	return result['seconds_per_call'] if 'seconds_per_call' in result else result['seconds']
+
+def compare(before:dict, after:dict, threshold:float)->list:
+	"""Returns a list of `(name, seconds_before, seconds_after, is_regression)`
+	for each benchmark present in both `before` and `after`."""
+	comparison = []
+	for name in before['results']:
+		if name not in after['results']:
+			continue
+		seconds_before = duration(before['results'][name])
+		seconds_after = duration(after['results'][name])
+		comparison.append((name, seconds_before, seconds_after, seconds_after > seconds_before*(1+threshold)))
+	return comparison
+
+def main():
+	parser = argparse.ArgumentParser(description='Compares two benchmark results and reports regressions.')
+	parser.add_argument('before', type=Path)
+	parser.add_argument('after', type=Path)
+	parser.add_argument('--threshold', type=float, default=.2, help='Relative slowdown considered a regression, e.g. 0.2 means 20 %%.')
+	args = parser.parse_args()
+
+	with open(args.before, 'r') as ifile:
+		before = json.load(ifile)
+	with open(args.after, 'r') as ifile:
+		after = json.load(ifile)
+	if before['parameters'] != after['parameters']:
+		print(f'Warning: the benchmarks were run with different parameters, {before["parameters"]} and {after["parameters"]}.')
+
+	comparison = compare(before, after, args.threshold)
+	for name,seconds_before,seconds_after,is_regression in comparison:
+		print(f'  {name:<45} {seconds_before*1e6:12.1f} µs -> {seconds_after*1e6:12.1f} µs ({seconds_after/seconds_before:5.2f}x){"  REGRESSION" if is_regression else ""}')
+	n_regressions = sum(is_regression for _,_,_,is_regression in comparison)
+	if n_regressions > 0:
+		print(f'{n_regressions} regression(s) above {args.threshold*100:.0f} %.')
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
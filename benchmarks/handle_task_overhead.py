@@ -0,0 +1,65 @@
+"""Micro-benchmark of the overhead that `RunBureaucrat.handle_task` adds
+to each task, i.e. the time spent entering and exiting the `with` block
+when the body does nothing.
+
+Usage:
+	python benchmarks/handle_task_overhead.py --n_tasks 1000 --stack_depth 50
+"""
+
+from pathlib import Path
+import argparse
+import tempfile
+import traceback
+import time
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from the_bureaucrat.bureaucrats import RunBureaucrat, path_to_script_of_caller
+
+def at_stack_depth(depth:int, func):
+	"""Calls `func` with `depth` extra frames on the stack, to emulate
+	deeply nested sweeps."""
+	if depth <= 0:
+		return func()
+	return at_stack_depth(depth-1, func)
+
+def time_per_call(func, n:int)->float:
+	"""Returns the average time, in seconds, of calling `func` `n` times."""
+	start = time.perf_counter()
+	for _ in range(n):
+		func()
+	return (time.perf_counter()-start)/n
+
+def caller_with_extract_stack():
+	return Path(traceback.extract_stack()[-2].filename)
+
+def caller_with_frame_lookup():
+	return path_to_script_of_caller()
+
+def main():
+	parser = argparse.ArgumentParser(description='Measures the per task overhead of `handle_task`.')
+	parser.add_argument('--n_tasks', type=int, default=1000)
+	parser.add_argument('--stack_depth', type=int, default=50, help='Number of extra frames in the stack when calling `handle_task`.')
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as path_to_temporary_directory:
+		bureaucrat = RunBureaucrat(Path(path_to_temporary_directory)/'benchmark_run')
+		bureaucrat.create_run()
+
+		def enter_and_exit_task(backup_this_python_file:bool):
+			with bureaucrat.handle_task('some_task', backup_this_python_file=backup_this_python_file):
+				pass
+
+		results = {
+			'caller detection with traceback.extract_stack (before)': at_stack_depth(args.stack_depth, lambda: time_per_call(caller_with_extract_stack, args.n_tasks)),
+			'caller detection with frame lookup (after)': at_stack_depth(args.stack_depth, lambda: time_per_call(caller_with_frame_lookup, args.n_tasks)),
+			'handle_task enter+exit, no backup': at_stack_depth(args.stack_depth, lambda: time_per_call(lambda: enter_and_exit_task(False), args.n_tasks)),
+			'handle_task enter+exit, with backup': at_stack_depth(args.stack_depth, lambda: time_per_call(lambda: enter_and_exit_task(True), args.n_tasks)),
+		}
+
+	print(f'Per task overhead, averaged over {args.n_tasks} tasks with {args.stack_depth} extra frames in the stack:')
+	for name,seconds in results.items():
+		print(f'  {name:<60} {seconds*1e6:10.1f} µs')
+
+if __name__ == '__main__':
+	main()
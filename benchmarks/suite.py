@@ -0,0 +1,103 @@
+"""Benchmark suite of the bureaucrat operations on a synthetic tree of
+runs, see `synthetic_tree.py`. The results are written as JSON so they
+can be compared between versions with `compare.py`.
+
+Usage:
+	python benchmarks/suite.py --depth 3 --fan_out 10 --output results.json
+"""
+
+from pathlib import Path
+import datetime
+import platform
+import argparse
+import tempfile
+import random
+import json
+import time
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from the_bureaucrat.bureaucrats import RunBureaucrat
+from synthetic_tree import build_synthetic_tree, number_of_runs, SWEEP_TASK_NAME, LEAF_TASK_NAME
+
+def time_per_call(func, arguments:list)->dict:
+	"""Calls `func` once for each element in `arguments` and returns
+	the average time per call, in seconds."""
+	start = time.perf_counter()
+	for argument in arguments:
+		func(argument)
+	return {'seconds_per_call': (time.perf_counter()-start)/len(arguments), 'n_calls': len(arguments)}
+
+def paths_to_runs_at_level(root:RunBureaucrat, level:int, fan_out:int)->list:
+	"""Returns the paths to all the runs at `level` in a synthetic tree,
+	without asking the bureaucrats, so it does not affect the measurements."""
+	paths = [root.path_to_run_directory]
+	for _ in range(level):
+		paths = [p/SWEEP_TASK_NAME/'subruns'/f'subrun_{n}' for p in paths for n in range(fan_out)]
+	return paths
+
+def run_suite(path:Path, depth:int, fan_out:int, n_samples:int)->dict:
+	"""Builds a synthetic tree in `path` and times the bureaucrat operations
+	on it. Queries are timed on up to `n_samples` runs, chosen at random,
+	each with a new bureaucrat so nothing is cached."""
+	results = {}
+
+	paths_to_new_runs = [path/'independent_runs'/f'run_{n}' for n in range(n_samples)]
+	(path/'independent_runs').mkdir()
+	results['create_run'] = time_per_call(lambda p: RunBureaucrat(p).create_run(), paths_to_new_runs)
+
+	timings = {}
+	start = time.perf_counter()
+	root = build_synthetic_tree(path/'synthetic_tree', depth=depth, fan_out=fan_out, timings=timings)
+	results['build_synthetic_tree'] = {'seconds': time.perf_counter()-start, 'n_runs': number_of_runs(depth, fan_out)}
+	if timings['n_create_subrun'] > 0:
+		results['create_subrun'] = {'seconds_per_call': timings['create_subrun']/timings['n_create_subrun'], 'n_calls': timings['n_create_subrun']}
+	results['handle_task enter+exit'] = {'seconds_per_call': timings['handle_task']/timings['n_handle_task'], 'n_calls': timings['n_handle_task']}
+
+	leaves = paths_to_runs_at_level(root, depth, fan_out)
+	leaves = random.sample(leaves, min(n_samples, len(leaves)))
+	if depth > 0:
+		sweeps = paths_to_runs_at_level(root, depth-1, fan_out)
+		sweeps = random.sample(sweeps, min(n_samples, len(sweeps)))
+		results['list_subruns_of_task'] = time_per_call(lambda p: RunBureaucrat(p).list_subruns_of_task(SWEEP_TASK_NAME), sweeps)
+	results['pseudopath'] = time_per_call(lambda p: RunBureaucrat(p).pseudopath, leaves)
+	results['was_task_run_successfully'] = time_per_call(lambda p: RunBureaucrat(p).was_task_run_successfully(LEAF_TASK_NAME), leaves)
+	results['check_these_tasks_were_run_successfully'] = time_per_call(lambda p: RunBureaucrat(p).check_these_tasks_were_run_successfully([LEAF_TASK_NAME]), leaves)
+	return results
+
+def main():
+	parser = argparse.ArgumentParser(description='Times the bureaucrat operations on a synthetic tree of runs.')
+	parser.add_argument('--depth', type=int, default=3)
+	parser.add_argument('--fan_out', type=int, default=10)
+	parser.add_argument('--n_samples', type=int, default=1000, help='Number of runs on which to time each query.')
+	parser.add_argument('--directory', type=Path, default=None, help='Where to create the synthetic tree. By default a temporary directory is used.')
+	parser.add_argument('--output', type=Path, default=None, help='File where to write the results as JSON.')
+	args = parser.parse_args()
+
+	print(f'Benchmarking on a synthetic tree with {number_of_runs(args.depth, args.fan_out)} runs...')
+	with tempfile.TemporaryDirectory(dir=args.directory) as path_to_temporary_directory:
+		results = run_suite(Path(path_to_temporary_directory), depth=args.depth, fan_out=args.fan_out, n_samples=args.n_samples)
+
+	for name,result in results.items():
+		if 'seconds_per_call' in result:
+			print(f'  {name:<45} {result["seconds_per_call"]*1e6:12.1f} µs per call ({result["n_calls"]} calls)')
+		else:
+			print(f'  {name:<45} {result["seconds"]:12.1f} s ({result["n_runs"]} runs)')
+
+	if args.output is not None:
+		with open(args.output, 'w') as ofile:
+			json.dump(
+				{
+					'when': datetime.datetime.now().isoformat(),
+					'python': sys.version,
+					'platform': platform.platform(),
+					'parameters': {'depth': args.depth, 'fan_out': args.fan_out, 'n_samples': args.n_samples},
+					'results': results,
+				},
+				ofile,
+				indent = 4,
+			)
+		print(f'Results written in {args.output}')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,84 @@
+"""Generates synthetic trees of runs, with configurable depth and fan
+out, to benchmark the bureaucrats on large campaigns. Each non leaf run
+has a task `sweep` with `fan_out` subruns, and each leaf run has a task
+`measure`. The total number of runs is 1 + fan_out + fan_out**2 + ... + fan_out**depth.
+
+Usage:
+	python benchmarks/synthetic_tree.py /tmp/synthetic_tree --depth 3 --fan_out 10
+"""
+
+from pathlib import Path
+import argparse
+import time
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from the_bureaucrat.bureaucrats import RunBureaucrat
+
+SWEEP_TASK_NAME = 'sweep'
+LEAF_TASK_NAME = 'measure'
+
+def number_of_runs(depth:int, fan_out:int)->int:
+	"""Returns the number of runs in a tree with `depth` and `fan_out`."""
+	return sum(fan_out**level for level in range(depth+1))
+
+def build_synthetic_tree(path_to_root_run:Path, depth:int, fan_out:int, timings:dict=None)->RunBureaucrat:
+	"""Creates a synthetic tree of runs and returns the bureaucrat of
+	the root run.
+
+	Arguments
+	---------
+	path_to_root_run: Path
+		Path where to create the root run. It must not exist.
+	depth: int
+		Number of levels of subruns below the root run.
+	fan_out: int
+		Number of subruns in each `sweep` task.
+	timings: dict, optional
+		If given, the total time spent in `create_subrun` and in
+		`handle_task` (entering and exiting the `with`) is accumulated
+		in it, under the keys `'create_subrun'` and `'handle_task'`,
+		together with the number of calls under `'n_create_subrun'`
+		and `'n_handle_task'`.
+	"""
+	timings = {} if timings is None else timings
+	for key in ['create_subrun','handle_task','n_create_subrun','n_handle_task']:
+		timings.setdefault(key, 0)
+
+	def fill(bureaucrat:RunBureaucrat, level:int):
+		task_name = LEAF_TASK_NAME if level == depth else SWEEP_TASK_NAME
+		start = time.perf_counter()
+		task = bureaucrat.handle_task(task_name, backup_this_python_file=False)
+		task.__enter__()
+		timings['handle_task'] += time.perf_counter() - start
+		timings['n_handle_task'] += 1
+		if level < depth:
+			for n in range(fan_out):
+				start = time.perf_counter()
+				subrun = task.create_subrun(f'subrun_{n}')
+				timings['create_subrun'] += time.perf_counter() - start
+				timings['n_create_subrun'] += 1
+				fill(subrun, level+1)
+		start = time.perf_counter()
+		task.__exit__(None, None, None)
+		timings['handle_task'] += time.perf_counter() - start
+
+	root = RunBureaucrat(Path(path_to_root_run))
+	root.create_run()
+	fill(root, 0)
+	return root
+
+def main():
+	parser = argparse.ArgumentParser(description='Creates a synthetic tree of runs.')
+	parser.add_argument('path', type=Path, help='Where to create the root run.')
+	parser.add_argument('--depth', type=int, default=3)
+	parser.add_argument('--fan_out', type=int, default=10)
+	args = parser.parse_args()
+
+	print(f'Creating {number_of_runs(args.depth, args.fan_out)} runs in {args.path}...')
+	start = time.perf_counter()
+	build_synthetic_tree(args.path, depth=args.depth, fan_out=args.fan_out)
+	print(f'Done in {time.perf_counter()-start:.1f} s.')
+
+if __name__ == '__main__':
+	main()
@@ -8,6 +8,11 @@ setuptools.setup(
 	description = "A bureaucrat to help managing data",
 	url = "",
 	packages = setuptools.find_packages(),
+	entry_points = {
+		'console_scripts': [
+			'bureaucrat = the_bureaucrat.cli:main',
+		],
+	},
 	classifiers = [
 		"Programming Language :: Python :: 3",
 		"License :: OSI Approved :: MIT License",
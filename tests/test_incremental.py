@@ -0,0 +1,40 @@
+import pytest
+from the_bureaucrat.bureaucrats import RunBureaucrat
+
+@pytest.fixture
+def run(tmp_path):
+	run = RunBureaucrat(tmp_path/'the_run')
+	run.create_run()
+	return run
+
+def _do_the_task(run:RunBureaucrat, result:str):
+	with run.handle_task('some_task', incremental=True, parameters={'a': 1}) as employee:
+		with open(employee.path_to_directory_of_my_task/'result.txt', 'w') as ofile:
+			print(result, file=ofile)
+		employee.create_subrun('subrun')
+	return employee
+
+def test_task_is_skipped_when_nothing_changed(run):
+	assert _do_the_task(run, 'old').was_skipped == False
+	with run.handle_task('some_task', incremental=True, parameters={'a': 1}) as employee:
+		assert employee.was_skipped == True
+	with run.handle_task('some_task', incremental=True, parameters={'a': 2}) as employee:
+		assert employee.was_skipped == False
+
+def test_writing_into_a_skipped_task_raises_and_keeps_the_old_results(run):
+	_do_the_task(run, 'old')
+	with pytest.raises(RuntimeError, match='was skipped'):
+		_do_the_task(run, 'new') # The body does not look at `was_skipped`.
+	with open(run.path_to_directory_of_task('some_task')/'result.txt') as ifile:
+		assert ifile.read() == 'old\n'
+	assert run.was_task_run_successfully('some_task')
+	assert [subrun.run_name for subrun in run.list_subruns_of_task('some_task')] == ['subrun']
+
+def test_creating_subruns_in_a_skipped_task_raises(run):
+	_do_the_task(run, 'old')
+	with run.handle_task('some_task', incremental=True, parameters={'a': 1}) as employee:
+		with pytest.raises(RuntimeError, match='was skipped'):
+			employee.create_subrun('another_subrun')
+		with pytest.raises(RuntimeError, match='was skipped'):
+			employee.create_subruns(['another_subrun'])
+	assert [subrun.run_name for subrun in run.list_subruns_of_task('some_task')] == ['subrun']
@@ -0,0 +1,83 @@
+from pathlib import Path
+import multiprocessing
+import shutil
+import os
+import pytest
+from the_bureaucrat.bureaucrats import RunBureaucrat
+
+N_WORKERS = 4
+
+def _work_on_the_sweep(path_to_the_run:Path, candidates:list, barrier):
+	"""Runs in a worker process, like many instances of the same script
+	sharing the subruns as a queue of work."""
+	barrier.wait() # So all the workers compete for the subruns.
+	with RunBureaucrat(path_to_the_run).handle_task('sweep', drop_old_data=False, backup_this_python_file=False) as employee:
+		while (lease := employee.claim_next_subrun(candidates, ttl=5)) is not None:
+			with lease:
+				with lease.subrun.handle_task('measure', backup_this_python_file=False) as subemployee:
+					with open(subemployee.path_to_directory_of_my_task/'who_did_it.txt', 'a') as ofile:
+						print(os.getpid(), file=ofile)
+
+def _hold_the_task(path_to_the_run:Path, task_is_held, may_finish):
+	with RunBureaucrat(path_to_the_run).handle_task('exclusive_task', exclusive=True, backup_this_python_file=False):
+		task_is_held.set()
+		may_finish.wait(timeout=60)
+
+def _fail_while_exiting_the_task(path_to_the_run:Path):
+	try:
+		with RunBureaucrat(path_to_the_run).handle_task('exclusive_task', exclusive=True, backup_this_python_file=False) as employee:
+			shutil.rmtree(employee.path_to_directory_of_my_task) # So writing the report fails.
+	except FileNotFoundError:
+		pass
+
+@pytest.fixture
+def run(tmp_path):
+	run = RunBureaucrat(tmp_path/'the_run')
+	run.create_run()
+	return run
+
+@pytest.fixture
+def context():
+	return multiprocessing.get_context('spawn') # Nothing is inherited from this process, as with independent scripts.
+
+def test_each_subrun_is_claimed_by_exactly_one_process(run, context):
+	candidates = [f'subrun_{n}' for n in range(20)]
+	barrier = context.Barrier(N_WORKERS)
+	workers = [context.Process(target=_work_on_the_sweep, args=(run.path_to_run_directory, candidates, barrier)) for _ in range(N_WORKERS)]
+	for worker in workers:
+		worker.start()
+	for worker in workers:
+		worker.join(timeout=120)
+	assert [worker.exitcode for worker in workers] == [0]*N_WORKERS
+
+	assert sorted(subrun.run_name for subrun in run.list_subruns_of_task('sweep')) == sorted(candidates)
+	for subrun in run.list_subruns_of_task('sweep'):
+		assert subrun.was_task_run_successfully('measure')
+		with open(subrun.path_to_directory_of_task('measure')/'who_did_it.txt') as ifile:
+			assert len(ifile.readlines()) == 1
+
+def test_exclusive_task_cannot_be_handled_while_another_process_holds_it(run, context):
+	task_is_held = context.Event()
+	may_finish = context.Event()
+	holder = context.Process(target=_hold_the_task, args=(run.path_to_run_directory, task_is_held, may_finish))
+	holder.start()
+	try:
+		assert task_is_held.wait(timeout=60)
+		with pytest.raises(RuntimeError, match='being handled by another worker'):
+			with run.handle_task('exclusive_task', exclusive=True, backup_this_python_file=False):
+				pass
+	finally:
+		may_finish.set()
+		holder.join(timeout=60)
+	assert holder.exitcode == 0
+	with run.handle_task('exclusive_task', exclusive=True, backup_this_python_file=False):
+		pass
+	assert run.was_task_run_successfully('exclusive_task')
+
+def test_lease_is_released_when_exiting_the_task_fails(run, context):
+	worker = context.Process(target=_fail_while_exiting_the_task, args=(run.path_to_run_directory,))
+	worker.start()
+	worker.join(timeout=60)
+	assert worker.exitcode == 0
+	with run.handle_task('exclusive_task', exclusive=True, backup_this_python_file=False): # Would fail until the lease expires.
+		pass
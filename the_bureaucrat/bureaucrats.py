@@ -6,6 +6,29 @@ import datetime
 import tempfile
 import traceback
 import shutil
+import os
+import sys
+import hashlib
+import json
+import fnmatch
+import socket
+import pickle
+import zipfile
+import concurrent.futures
+import threading
+import functools
+from .index import BureaucratIndex, INDEX_FILE_NAME
+from . import trash
+from .tables import TableWriter, TableReader
+from .packing import PACK_FILE_NAME, find_pack_containing, open_pack, pack_run, unpack_run
+from .events import RunWatcher, publish
+from .leases import Lease, LEASES_DIRECTORY_NAME, DEFAULT_LEASE_TTL_SECONDS
+from .disk_usage import bytes_used_by, bytes_in_directory, bytes_in_directory_of_task, forget_cached_disk_usage
+
+try:
+	import resource
+except ImportError: # Not available on Windows.
+	resource = None
 
 warnings.warn(
 	f'`the_bureaucrat` is deprecated, please consider using `datanodes` https://github.com/SengerM/datanodes',
@@ -22,30 +45,229 @@ def find_ugly_characters_better_to_avoid_in_paths(path:Path):
 	NICE_CHARACTERS_FOR_FILE_AND_DIRECTORY_NAMES = {'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9', '.', '_', '-'} # https://stackoverflow.com/a/1976172/8849755
 	return set(str(path))-NICE_CHARACTERS_FOR_FILE_AND_DIRECTORY_NAMES-{'/'}
 
-def create_run(path_where_to_create_the_run:Path, run_name:str)->Path:
-	"""Creates a new run."""
+def create_run(path_where_to_create_the_run:Path, run_name:str, depth:int=None)->Path:
+	"""Creates a new run. If `depth`, i.e. the number of ancestors of
+	the run, is given it is recorded in the run info file."""
 	path_to_run = path_where_to_create_the_run/run_name
 	if find_ugly_characters_better_to_avoid_in_paths(path_to_run):
 		warnings.warn(f'Creating run in {path_to_run} I see it contains the characters {find_ugly_characters_better_to_avoid_in_paths(path_to_run)} which are better to avoid.')
 	if path_to_run.is_dir():
 		raise RuntimeError(f'Cannot create run {run_name} in {path_where_to_create_the_run} because it already exists.')
 	path_to_run.mkdir(parents=True)
-	with open(path_to_run/'bureaucrat_run_info.txt', 'w') as ofile:
-		print(f'This directory contains a run named {repr(run_name)}, created by `the_bureaucrat` on {datetime.datetime.now()}.', file=ofile)
+	_write_run_info_file(path_to_run, run_name, depth)
 	return path_to_run
 
+def _write_run_info_file(path_to_run:Path, run_name:str, depth:int=None):
+	with open(os.path.join(path_to_run, 'bureaucrat_run_info.txt'), 'w') as ofile:
+		print(f'This directory contains a run named {repr(run_name)}, created by `the_bureaucrat` on {datetime.datetime.now()}.', file=ofile)
+		if depth is not None:
+			print(f'depth: {depth}', file=ofile)
+
 def exists_run(path_where_to_find_the_run:Path, run_name:str)->bool:
 	"""Returns `True` or `False` depending on whether the `run_name` is
 	present in `path_where_to_find_the_run`."""
-	path_to_run = path_where_to_find_the_run/run_name
-	return (path_to_run/'bureaucrat_run_info.txt').is_file()
+	return os.path.isfile(os.path.join(path_where_to_find_the_run, run_name, 'bureaucrat_run_info.txt'))
+
+TASK_REPORT_FILE_NAME = 'bureaucrat_task_report.json'
+LEGACY_TASK_REPORT_FILE_NAME = 'bureaucrat_task_report.txt'
+LEGACY_SUCCESS_MARKER = 'exit_status: task completed successfully with no errors :)'
+CPU_PROFILE_FILE_NAME = 'bureaucrat_profile.prof'
+MEMORY_PROFILE_FILE_NAME = 'bureaucrat_memory_profile.txt'
+GATHER_CACHE_DIRECTORY_NAME = '.bureaucrat_gather_cache'
+SCRIPT_STORE_DIRECTORY_NAME = '.bureaucrat_script_store'
+SCRIPT_STORE_POINTER_HEADER = '# the_bureaucrat: the content of this backup is in the script store, sha256 '
+
+_active_cpu_profiler = None
+_tasks_profiling_memory = [] # Innermost last.
+_scripts_by_path = {}
+_REPORT_ENCODER = json.JSONEncoder(default=repr) # Created once, `json.dumps` with `default` creates a new one each time.
+
+ASYNC_MAX_WORKERS = 8 # Maximum number of threads doing file system work for the async methods.
+_async_executor = None
+_async_executor_lock = threading.Lock()
+
+async def _offload(func, *args, **kwargs):
+	"""Runs `func(*args, **kwargs)` in a bounded pool of threads shared
+	by all the async methods, so the event loop is not blocked by the
+	file system."""
+	global _async_executor
+	import asyncio # Imported here, instead of at the top, to keep the import of this module fast.
+	with _async_executor_lock:
+		if _async_executor is None:
+			_async_executor = concurrent.futures.ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix='bureaucrat_async')
+	return await asyncio.get_running_loop().run_in_executor(_async_executor, functools.partial(func, *args, **kwargs))
+
+def path_to_script_of_caller(depth:int=1)->Path:
+	"""Returns a `Path` pointing to the file from which the function
+	calling `path_to_script_of_caller` was called. Use `depth` to go 
+	further up in the stack, e.g. `depth=2` gives the file of the caller
+	of the caller. This is much cheaper than `traceback.extract_stack`
+	since it does not build the whole stack nor reads any source code."""
+	return Path(sys._getframe(depth+1).f_code.co_filename)
+
+def is_bureaucrat_internal(name:str)->bool:
+	"""Returns `True` if `name` is the name of a file or directory used
+	internally by the bureaucrats (e.g. the script store), which must not
+	be considered as a task nor as a subrun."""
+	return name.startswith('.bureaucrat')
+
+def read_script_once(path_to_script:Path)->tuple:
+	"""Reads a script and returns a tuple `(sha256, content)`. Each
+	script is read and hashed only once per process."""
+	path_to_script = Path(path_to_script)
+	if path_to_script not in _scripts_by_path:
+		content = path_to_script.read_bytes()
+		_scripts_by_path[path_to_script] = (hashlib.sha256(content).hexdigest(), content)
+	return _scripts_by_path[path_to_script]
+
+def _as_path(p):
+	"""Converts `p` into a `Path`, unless it is a `zipfile.Path` pointing
+	inside a packed run, which is returned as it is."""
+	return p if isinstance(p, (Path, zipfile.Path)) else Path(p)
+
+def _open_file_in(path_to_directory, file_name:str):
+	"""Opens `file_name` within `path_to_directory` for reading text, also
+	if it is a `zipfile.Path` pointing inside a packed run."""
+	if isinstance(path_to_directory, zipfile.Path):
+		return (path_to_directory/file_name).open('r')
+	return open(os.path.join(path_to_directory, file_name), 'r')
+
+def path_to_report_of_task(path_to_directory_of_task:Path)->Path:
+	"""Returns a `Path` pointing to the report of a task, either the
+	JSON one or the text one written by older versions of `the_bureaucrat`,
+	or `None` if there is no report."""
+	for file_name in [TASK_REPORT_FILE_NAME, LEGACY_TASK_REPORT_FILE_NAME]:
+		p = _as_path(path_to_directory_of_task)/file_name
+		if p.is_file():
+			return p
+	return None
+
+def read_task_report(path_to_directory_of_task:Path)->dict:
+	"""Reads the report within the directory of a task and returns it 
+	as a dictionary, or `None` if there is no report. The key `'exit_status'`
+	is either `'successful'` or `'failed'`. Text reports written by older
+	versions of `the_bureaucrat` are also understood, in which case the
+	whole text is under the key `'legacy_report'`."""
+	try:
+		with _open_file_in(path_to_directory_of_task, TASK_REPORT_FILE_NAME) as ifile:
+			return json.loads(ifile.read())
+	except FileNotFoundError:
+		pass
+	except (NotADirectoryError, ValueError):
+		return None
+	try:
+		with _open_file_in(path_to_directory_of_task, LEGACY_TASK_REPORT_FILE_NAME) as ifile:
+			legacy_report = ifile.read()
+	except (FileNotFoundError, NotADirectoryError):
+		return None
+	report = {
+		'exit_status': 'successful' if LEGACY_SUCCESS_MARKER in legacy_report.split('\n')[0] else 'failed',
+		'legacy_report': legacy_report,
+	}
+	for line in legacy_report.split('\n'):
+		if line.startswith('fingerprint: '):
+			report['fingerprint'] = json.loads(line[len('fingerprint: '):])
+	return report
+
+def was_task_completed_successfully(path_to_directory_of_task:Path)->bool:
+	"""Reads the report within the directory of a task and returns `True`
+	if it says that the task was completed successfully, `False` otherwise
+	(including when there is no report at all). Only the first line of
+	the text report is needed for this, which is cheaper than the JSON
+	one, and the JSON one is read only if there is no text report."""
+	try:
+		with _open_file_in(path_to_directory_of_task, LEGACY_TASK_REPORT_FILE_NAME) as ifile:
+			return LEGACY_SUCCESS_MARKER in ifile.readline()
+	except (FileNotFoundError, NotADirectoryError):
+		pass
+	except Exception:
+		return False
+	try:
+		return read_task_report(path_to_directory_of_task)['exit_status'] == 'successful'
+	except Exception:
+		return False
+
+def _status_of_task_in_directory(path_to_directory_of_task:Path, names_of_files:set)->str:
+	"""Returns `'running'`, `'successful'` or `'failed'` for the task in
+	`path_to_directory_of_task`, whose files are `names_of_files`."""
+	if TASK_REPORT_FILE_NAME not in names_of_files and LEGACY_TASK_REPORT_FILE_NAME not in names_of_files:
+		return 'running'
+	return 'successful' if was_task_completed_successfully(path_to_directory_of_task) else 'failed'
+
+def read_fingerprint_of_task(path_to_directory_of_task:Path)->dict:
+	"""Returns the fingerprint recorded in the report of a task that was
+	handled with `incremental=True`, or `None` if there is no such thing."""
+	report = read_task_report(path_to_directory_of_task)
+	return None if report is None else report.get('fingerprint')
+
+def measure_resources_used_by_this_process()->dict:
+	"""Returns a dictionary with the resources used so far by this process.
+	Those that cannot be measured in the current platform are `None`."""
+	times = os.times()
+	measurements = {
+		'wall_time': time.time(),
+		'cpu_user_seconds': times.user,
+		'cpu_system_seconds': times.system,
+		'peak_rss_bytes': None,
+		'io_read_bytes': None,
+		'io_write_bytes': None,
+	}
+	if resource is not None:
+		measurements['peak_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*(1 if sys.platform == 'darwin' else 1024)
+	try:
+		with open('/proc/self/io', 'r') as ifile:
+			io = dict(line.split(': ') for line in ifile.read().split('\n') if ': ' in line)
+		measurements['io_read_bytes'] = int(io['read_bytes'])
+		measurements['io_write_bytes'] = int(io['write_bytes'])
+	except (OSError, KeyError, ValueError):
+		pass
+	return measurements
+
+def _signature_of_task_report(path_to_directory_of_task:Path)->str:
+	"""Returns a hash of the report of a task if it was completed successfully,
+	otherwise `None`. It changes every time the task is run again."""
+	if not was_task_completed_successfully(path_to_directory_of_task):
+		return None
+	try:
+		return hashlib.sha256(path_to_report_of_task(path_to_directory_of_task).read_bytes()).hexdigest()
+	except (FileNotFoundError, AttributeError):
+		return None
+
+def _read_csv(path_to_file):
+	"""Reads a CSV file with `pandas.read_csv`, also if it is within a
+	packed run. This is the default reader of `gather`."""
+	import pandas
+	if isinstance(path_to_file, zipfile.Path):
+		with path_to_file.open('rb') as ifile:
+			return pandas.read_csv(ifile)
+	return pandas.read_csv(path_to_file)
+
+def _signature_of_file(path_to_file)->tuple:
+	"""Returns something that changes whenever the file changes. For files
+	within a packed run this is the modification time of the archive."""
+	if isinstance(path_to_file, zipfile.Path):
+		return (os.stat(path_to_file.root.filename).st_mtime_ns, path_to_file.at)
+	file_stat = os.stat(path_to_file)
+	return (file_stat.st_mtime_ns, file_stat.st_size)
+
+def _call_function_on_run(func, path_to_the_run:Path, kwargs:dict)->tuple:
+	"""Calls `func(RunBureaucrat(path_to_the_run), **kwargs)`, catching
+	any error. Meant to be executed in a worker of `map_subruns`."""
+	try:
+		return True, func(RunBureaucrat(path_to_the_run), **kwargs), None
+	except Exception:
+		return False, None, traceback.format_exc()
 
 def delete_directory_and_or_file_and_subtree(p:Path):
-	"""Delete whatever is in `p` and all its contents."""
+	"""Delete whatever is in `p` and all its contents, also files that
+	are read only, see `trash.make_writable_and_retry`."""
 	if p.is_file() or p.is_symlink():
-		p.unlink()
+		try:
+			p.unlink()
+		except PermissionError:
+			trash.make_writable_and_retry(os.unlink, p, None)
 	elif p.is_dir():
-		rmtree(p)
+		rmtree(p, onerror=trash.make_writable_and_retry)
 
 class RunBureaucrat:
 	def __init__(self, path_to_the_run:Path):
@@ -57,7 +279,7 @@ class RunBureaucrat:
 			A path to the run. The last element of the path will be the
 			run name.
 		"""
-		self._path_to_the_run = Path(path_to_the_run)
+		self._path_to_the_run = path_to_the_run if isinstance(path_to_the_run, Path) else Path(path_to_the_run) # Bureaucrats are created all the time with a `Path` at hand, which is not worth parsing again.
 	
 	@property
 	def path_to_run_directory(self)->Path:
@@ -77,34 +299,143 @@ class RunBureaucrat:
 			self._temporary_directory = tempfile.TemporaryDirectory()
 		return Path(self._temporary_directory.name)
 	
+	@property
+	def _packed(self)->tuple:
+		"""If this run lies within a packed run (see `pack`) returns a tuple
+		`(packed_run, relative_path)`, otherwise returns `None`. The result
+		is cached, also when it is `None`."""
+		if not hasattr(self, '_cached_packed'):
+			path = os.fspath(self.path_to_run_directory)
+			if os.path.isdir(path): # The usual case, then only the run itself can be packed.
+				self._cached_packed = (open_pack(self.path_to_run_directory), '') if os.path.isfile(os.path.join(path, PACK_FILE_NAME)) else None
+			else: # It does not exist, or it is within a packed run.
+				self._cached_packed = find_pack_containing(self.path_to_run_directory)
+		return self._cached_packed
+	
+	@property
+	def _readable_run_directory(self):
+		"""Returns a `Path` pointing to the directory of the run, or a
+		`zipfile.Path` if the run is packed."""
+		if self._packed is None:
+			return self.path_to_run_directory
+		packed_run, relative_path = self._packed
+		return packed_run.path(relative_path)
+	
+	@property
+	def _recorded_depth(self)->int:
+		"""Returns the number of ancestors of this run as recorded in the
+		run info file when it was created, or `None` if it was not recorded
+		(e.g. the run was created by an older version of `the_bureaucrat`)
+		or if it disagrees with the file system, i.e. the run was copied
+		or moved elsewhere. To check this only the markers of the parent,
+		which must exist if and only if the depth is not 0, and of the
+		root are looked for."""
+		if not hasattr(self, '_cached_recorded_depth'):
+			try:
+				with _open_file_in(self.path_to_run_directory, 'bureaucrat_run_info.txt') as ifile:
+					run_info = ifile.read()
+			except (FileNotFoundError, NotADirectoryError):
+				if self._packed is None or self._packed[1] == '': # Only then it is worth looking for a pack.
+					return None
+				try:
+					with _open_file_in(self._readable_run_directory, 'bureaucrat_run_info.txt') as ifile:
+						run_info = ifile.read()
+				except FileNotFoundError:
+					return None
+			depth = None
+			for line in run_info.split('\n')[1:]:
+				if line.startswith('depth: ') and line[len('depth: '):].isdigit():
+					depth = int(line[len('depth: '):])
+			if depth == 0 and self.parent is not None:
+				depth = None
+			elif depth is not None and depth > 0:
+				if 3*depth >= len(Path(os.path.abspath(self.path_to_run_directory)).parts) or self.parent is None or (depth > 1 and not self._ancestor(depth).exists()): # With depth 1 the root is the parent, already found.
+					depth = None
+			self._cached_recorded_depth = depth
+		return self._cached_recorded_depth
+	
+	@property
+	def _depth(self)->int:
+		"""Returns the number of ancestors of this run."""
+		if self._recorded_depth is not None:
+			return self._recorded_depth
+		return len(self.pseudopath.parts) - 1
+	
 	@property
 	def parent(self):
 		"""Returns a `RunBureaucrat` pointing to the parent of this instance,
 		if it does not exist, returns `None`."""
-		p = self.path_to_run_directory.parent.parent.parent
-		if exists_run(p.parent, p.name) == False:
-			return None
-		return RunBureaucrat(p)
+		if not hasattr(self, '_parent'):
+			p = self._ancestor(1)
+			self._parent = p if p.exists() else None
+		return self._parent
+	
+	@property
+	def root(self):
+		"""Returns a `RunBureaucrat` pointing to the root run of the tree
+		this run belongs to, i.e. the farthest ancestor. If this run
+		has no parent, the root is the run itself."""
+		if not hasattr(self, '_root'):
+			if self._recorded_depth is not None:
+				self._root = self._ancestor(self._recorded_depth) if self._recorded_depth > 0 else self
+			else:
+				root = self
+				while root.parent is not None:
+					root = root.parent
+				self._root = root
+		return self._root
+	
+	def _ancestor(self, levels:int):
+		"""Returns a `RunBureaucrat` pointing to where the ancestor `levels`
+		runs above this one should be."""
+		parts = self.path_to_run_directory.parts
+		if len(parts) > 3*levels and '..' not in parts: # The usual case, so it is worth avoiding the string operations below.
+			return RunBureaucrat(self.path_to_run_directory.parents[3*levels-1])
+		path = os.path.normpath(os.path.join(self.path_to_run_directory, *['..']*3*levels))
+		if path == '.' or path.startswith('..'): # Above the current working directory, so the relative path does not tell the names of the directories.
+			path = os.path.abspath(path)
+		return RunBureaucrat(Path(path))
+	
+	@property
+	def index(self)->BureaucratIndex:
+		"""Returns the `BureaucratIndex` of the tree this run belongs to,
+		if the root run has one, otherwise returns `None`. See also
+		`rebuild_index`. Only an index that was found is cached, so one
+		created later, e.g. by another process, is also found."""
+		if getattr(self, '_index', None) is None:
+			if not os.path.isfile(os.path.join(self.root.path_to_run_directory, INDEX_FILE_NAME)): # Same as `BureaucratIndex.exists` but cheaper, as this is checked often.
+				return None
+			self._index = BureaucratIndex(self.root.path_to_run_directory)
+		return self._index
 	
 	@property
 	def pseudopath(self)->Path:
 		"""Returns the 'pseudopath' to this bureaucrat, this means the
 		path counting only the `RunBureaucrat` instances, not the directories.
 		If the run does not exist in the file system, `None` is returned."""
-		if self.exists() == False:
+		if getattr(self, '_pseudopath', None) is not None:
+			return self._pseudopath
+		if self._recorded_depth is not None: # The names are taken from the path, so renamed runs are fine.
+			self._pseudopath = Path(*reversed(Path(os.path.abspath(self.path_to_run_directory)).parts[-1::-3][:self._recorded_depth+1]))
+		elif self.exists() == False:
 			self._pseudopath = None
 		else:
 			pseudopath = [self]
-			while pseudopath[0].parent is not None:
-				pseudopath.insert(0, pseudopath[0].parent)
-			self._pseudopath = '/'.join([b.run_name for b in pseudopath])
-			self._pseudopath = Path(self._pseudopath)
+			while pseudopath[-1].parent is not None:
+				pseudopath.append(pseudopath[-1].parent)
+			self._pseudopath = Path('/'.join([b.run_name for b in reversed(pseudopath)]))
 		return self._pseudopath
 	
 	def exists(self):
 		"""Returns `True` or `False` depending on whether the run already
 		exists in the file system or not."""
-		return exists_run(path_where_to_find_the_run = self.path_to_run_directory.parent, run_name = self.run_name)
+		if self.path_to_run_directory.name == '': # E.g. `Path('.')` or `Path('/')`, which happen when looking for the parent of a run near the top.
+			return False
+		if exists_run(path_where_to_find_the_run = self.path_to_run_directory.parent, run_name = self.run_name):
+			return True
+		if os.path.isdir(self.path_to_run_directory): # Only if it is not in the file system it is worth looking for a pack.
+			return False
+		return self._packed is not None and (self._readable_run_directory/'bureaucrat_run_info.txt').is_file()
 	
 	def _path_to_directory_of_subruns_of_task(self, task_name:str)->Path:
 		"""Returns a `Path` pointing to where the subruns should be found."""
@@ -113,14 +444,19 @@ class RunBureaucrat:
 	def path_to_directory_of_task(self, task_name:str)->Path:
 		"""Returns a `Path` pointing to the directory of a task named 
 		`task_name` within the run being handled by this `RunBureaucrat`.
-		Note that such directory needs not to exist. 
+		Note that such directory needs not to exist. If the run was packed
+		(see `pack`) a `zipfile.Path` is returned instead, which can be
+		used to read the files of the task.
 		
 		Arguments
 		---------
 		task_name: str
 			The name of the task for which you want the path to its directory.
 		"""
-		return self.path_to_run_directory/task_name
+		path_to_task = self.path_to_run_directory/task_name
+		if os.path.isdir(path_to_task): # The usual case, no need to look for a pack.
+			return path_to_task
+		return self._readable_run_directory/task_name
 	
 	def list_subruns_of_task(self, task_name:str)->list:
 		"""Returns a list of `RunBureaucrat`s pointing to the subruns.
@@ -132,10 +468,165 @@ class RunBureaucrat:
 		task_name: str
 			The name of the task.
 		"""
-		if self._path_to_directory_of_subruns_of_task(task_name).exists():
-			return [RunBureaucrat(p) for p in (self._path_to_directory_of_subruns_of_task(task_name)).iterdir() if p.is_dir()]
-		else:
-			return []
+		path_to_subruns = self._path_to_directory_of_subruns_of_task(task_name)
+		if isinstance(path_to_subruns, Path):
+			try:
+				with os.scandir(path_to_subruns) as entries:
+					return [RunBureaucrat(path_to_subruns/entry.name) for entry in entries if entry.is_dir() and not is_bureaucrat_internal(entry.name)]
+			except (FileNotFoundError, NotADirectoryError):
+				return []
+		if path_to_subruns.exists(): # Within a packed run.
+			return [RunBureaucrat(self.path_to_run_directory/task_name/'subruns'/p.name) for p in path_to_subruns.iterdir() if p.is_dir() and not is_bureaucrat_internal(p.name)]
+		return []
+	
+	def walk(self, max_depth:int=None, tasks_names:list=None, tasks_status:bool=None, max_workers:int=16):
+		"""Walks recursively through this run and all its subruns, yielding
+		the runs as they are found. The tree is explored concurrently
+		using a pool of threads, so the order in which runs are yielded
+		is not defined, other than a run is always yielded after its 
+		parent was scanned.
+		
+		Usage example:
+		```
+		for pseudopath, run, tasks in a_run_bureaucrat.walk(tasks_status=False):
+			print(f'Run {pseudopath} has failed tasks {list(tasks)}')
+		```
+		
+		Arguments
+		---------
+		max_depth: int, default None
+			How deep to go into the subruns, `0` means only this run, `1`
+			means this run and its subruns, etc. If `None`, the whole tree
+			is walked.
+		tasks_names: list of str, default None
+			If given, only these tasks are reported, and only the runs 
+			having at least one of them are yielded.
+		tasks_status: bool, default None
+			If `True`, only tasks that were run successfully are reported,
+			if `False` only tasks that were not. Runs with no tasks matching
+			are not yielded. If `None`, all tasks are reported.
+		max_workers: int, default 16
+			Number of threads used to scan directories concurrently.
+		
+		Yields
+		------
+		pseudopath: Path
+			The pseudopath of the run.
+		run: RunBureaucrat
+			A `RunBureaucrat` pointing to the run.
+		tasks_with_status: dict
+			A dictionary of the form `{task_name: was_run_successfully}`.
+		"""
+		if not self.exists():
+			raise RuntimeError(f'Cannot walk run {repr(self.run_name)} in {self.path_to_run_directory} because it does not exist.')
+		if isinstance(tasks_names, str):
+			tasks_names = [tasks_names]
+		tasks_names = None if tasks_names is None else set(tasks_names)
+		
+		def scan_packed(path_to_run:Path, packed:tuple):
+			packed_run, relative_path = packed
+			tasks_with_status = {}
+			subruns = []
+			for task in packed_run.path(relative_path).iterdir():
+				if not task.is_dir() or is_bureaucrat_internal(task.name):
+					continue
+				if tasks_names is None or task.name in tasks_names:
+					tasks_with_status[task.name] = was_task_completed_successfully(task)
+				if (task/'subruns').is_dir():
+					subruns += [
+						(path_to_run/task.name/'subruns'/subrun.name, (packed_run, '/'.join([p for p in [relative_path, task.name, 'subruns', subrun.name] if p != ''])))
+						for subrun in (task/'subruns').iterdir() if subrun.is_dir() and not is_bureaucrat_internal(subrun.name)
+					]
+			return tasks_with_status, subruns
+		
+		def scan(path_to_run:Path, packed:tuple):
+			if packed is not None:
+				tasks_with_status, subruns = scan_packed(path_to_run, packed)
+			else:
+				tasks_with_status = {}
+				subruns = []
+				with os.scandir(path_to_run) as entries:
+					for entry in entries:
+						if entry.name == PACK_FILE_NAME:
+							tasks_with_status, subruns = scan_packed(path_to_run, (open_pack(path_to_run), ''))
+							break
+						if not entry.is_dir() or is_bureaucrat_internal(entry.name):
+							continue
+						if tasks_names is None or entry.name in tasks_names:
+							tasks_with_status[entry.name] = was_task_completed_successfully(entry.path)
+						try:
+							with os.scandir(os.path.join(entry.path, 'subruns')) as subruns_entries:
+								subruns += [(Path(subrun.path), None) for subrun in subruns_entries if subrun.is_dir() and not is_bureaucrat_internal(subrun.name)]
+						except (FileNotFoundError, NotADirectoryError):
+							pass
+			if tasks_status is not None:
+				tasks_with_status = {task_name: status for task_name,status in tasks_with_status.items() if status == tasks_status}
+			return tasks_with_status, subruns
+		
+		root = self.root
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+		try:
+			packed = self._packed if self._packed is not None and self._packed[1] != '' else None
+			pending = {executor.submit(scan, self.path_to_run_directory, packed): (self.pseudopath, self.path_to_run_directory, 0, packed)}
+			while len(pending) > 0:
+				done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					pseudopath, path_to_run, depth, packed = pending.pop(future)
+					tasks_with_status, subruns = future.result()
+					if max_depth is None or depth < max_depth:
+						for path_to_subrun, packed_subrun in subruns:
+							pending[executor.submit(scan, path_to_subrun, packed_subrun)] = (pseudopath/path_to_subrun.name, path_to_subrun, depth+1, packed_subrun)
+					if len(tasks_with_status) == 0 and (tasks_names is not None or tasks_status is not None):
+						continue
+					run = RunBureaucrat(path_to_run)
+					run._root = root
+					if packed is not None:
+						run._cached_packed = packed
+					yield pseudopath, run, tasks_with_status
+		finally:
+			executor.shutdown(wait=False, cancel_futures=True)
+	
+	def watch(self, include_existing:bool=False, backend:str='auto', poll_interval:float=1)->RunWatcher:
+		"""Watches this run and all its subruns and reports, as they happen,
+		when runs and subruns are created and when tasks start and finish,
+		instead of polling with `was_task_run_successfully`. Usage example:
+		```
+		with bureaucrat.watch() as events:
+			for event in events:
+				print(event.kind, event.path_to_run, event.task_name)
+		```
+		It can also be used with `async for`. Events produced by bureaucrats
+		in this same process are delivered immediately, those from other
+		processes are noticed through the file system.
+		
+		Arguments
+		---------
+		include_existing: bool, default False
+			If `True`, the first events describe the runs and tasks that
+			already exist. Otherwise only what happens from now on is reported.
+		backend: str, default 'auto'
+			How to notice what other processes do. Options are `'inotify'`
+			(only on Linux), `'poll'` or `'auto'`, which uses inotify when
+			available and otherwise falls back to polling the modification
+			time of the directories, which never opens any report unless
+			something changed.
+		poll_interval: float, default 1
+			Seconds between polls, only used when polling.
+		
+		Returns
+		-------
+		watcher: RunWatcher
+			An iterator of `BureaucratEvent`s, see `the_bureaucrat.events`.
+		"""
+		if not self.exists():
+			raise RuntimeError(f'Cannot watch run {repr(self.run_name)} in {self.path_to_run_directory} because it does not exist.')
+		return RunWatcher(
+			self.path_to_run_directory,
+			status_of_task = _status_of_task_in_directory,
+			include_existing = include_existing,
+			backend = backend,
+			poll_interval = poll_interval,
+		)
 	
 	def was_task_run_successfully(self, task_name:str)->bool:
 		"""If `task_name` was successfully run beforehand returns `True`,
@@ -153,14 +644,65 @@ class RunBureaucrat:
 			`True` or `False` telling if the tasks was run successfully
 			or not.
 		"""
-		was_run = False
-		try:
-			with open(self.path_to_directory_of_task(task_name)/'bureaucrat_task_report.txt', 'r') as ifile:
-				if 'exit_status: task completed successfully with no errors :)' in ifile.readline():
-					was_run = True
-		except Exception:
-			pass
-		return was_run
+		if was_task_completed_successfully(self.path_to_run_directory/task_name):
+			return True
+		return self._packed is not None and was_task_completed_successfully(self.path_to_directory_of_task(task_name)) # Only then it is worth looking for a pack.
+	
+	def read_table(self, task_name:str, name:str)->TableReader:
+		"""Returns a `TableReader` to read a table that was created with
+		`TaskBureaucrat.open_table`. Tables from tasks that failed, or that
+		are still running, can also be read up to the last chunk written.
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task that created the table.
+		name: str
+			The name of the table.
+		"""
+		return TableReader(self.path_to_directory_of_task(task_name)/name)
+	
+	def open_array(self, task_name:str, name:str, mode:str='r'):
+		"""Opens an array created with `TaskBureaucrat.create_array` without
+		loading it into memory, so it can be sliced even if it is huge.
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task that created the array.
+		name: str
+			The name of the array.
+		mode: str, default 'r'
+			Either `'r'` (read only), `'r+'` (read and write) or `'c'`
+			(copy on write, changes are not saved to the file).
+		
+		Returns
+		-------
+		array: numpy.memmap
+			The file backed array.
+		"""
+		import numpy
+		OPTIONS_FOR_MODE = {'r','r+','c'}
+		if mode not in OPTIONS_FOR_MODE:
+			raise ValueError(f'`mode` must be one of {OPTIONS_FOR_MODE}, received {repr(mode)}. ')
+		path_to_array = self.path_to_directory_of_task(task_name)/f'{name}.npy'
+		if not path_to_array.is_file():
+			raise FileNotFoundError(f'There is no array {repr(name)} in task {repr(task_name)} of run {self.pseudopath} located in {self.path_to_run_directory}.')
+		return numpy.lib.format.open_memmap(path_to_array, mode=mode)
+	
+	def read_task_report(self, task_name:str)->dict:
+		"""Returns the report of a task as a dictionary, or `None` if the
+		task has no report. The report includes the exit status, start 
+		and end times, CPU time, peak memory, bytes read and written,
+		host and PID, and the traceback in case of errors. Reports from
+		older versions of `the_bureaucrat` only have the exit status.
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task.
+		"""
+		return read_task_report(self.path_to_directory_of_task(task_name))
 	
 	def check_these_tasks_were_run_successfully(self, tasks_names:list, raise_error:bool=True)->bool:
 		"""Check that certain tasks were run successfully beforehand.
@@ -190,7 +732,7 @@ class RunBureaucrat:
 			raise RuntimeError(f"Task(s) {tasks_not_run} was(were)n't successfully run beforehand on run {self.pseudopath} located in {self.path_to_run_directory}.")
 		return all_tasks_were_run
 	
-	def create_run(self, if_exists:str='raise error'):
+	def create_run(self, if_exists:str='raise error', delete_in_background:bool=False):
 		"""Creates a run where this `RunBureaucrat` is pointing to.
 		
 		Arguments
@@ -204,27 +746,584 @@ class RunBureaucrat:
 			(together with all its contents) and a new run will be 
 			created instead.
 			- `'skip'`: If the run already exists, nothing is done.
+		delete_in_background: bool, default False
+			Only relevant for `if_exists='override'`. If `True`, the old
+			run is moved into a trash directory (which is instantaneous)
+			and then deleted in a background thread, so this method does
+			not have to wait for the deletion to finish.
 		"""
 		OPTIONS_FOR_IF_EXISTS_ARGUMENT = {'raise error','override','skip'}
 		if if_exists not in OPTIONS_FOR_IF_EXISTS_ARGUMENT:
 			raise ValueError(f'`if_exists` must be one of {OPTIONS_FOR_IF_EXISTS_ARGUMENT}, received {repr(if_exists)}. ')
+		if not os.path.isdir(self.path_to_run_directory.parent) and self._packed is not None and self._packed[1] != '': # Only if the directory where to create it is not in the file system it can be within a pack.
+			raise RuntimeError(f'Cannot create run {repr(self.run_name)} in {self.path_to_run_directory} because it is within the packed run located in {self._packed[0].path_to_run}, which is read only. Use `unpack` first.')
 		
 		if exists_run(self.path_to_run_directory.parent, self.run_name):
 			if if_exists == 'raise error':
 				raise RuntimeError(f'Cannot create run {repr(self.run_name)} in {self.path_to_run_directory} because it already exists.')
 			elif if_exists == 'override':
-				delete_directory_and_or_file_and_subtree(self.path_to_run_directory)
+				if self.index is not None:
+					if self.index.path_to_root_run == self.path_to_run_directory:
+						self._index = None # The index lives within this run, so it goes away with it.
+					else:
+						self.index.forget_run(self.path_to_run_directory)
+				if delete_in_background == True:
+					trash.delete_in_background(self.path_to_run_directory)
+				else:
+					delete_directory_and_or_file_and_subtree(self.path_to_run_directory)
 			elif if_exists == 'skip':
 				return
 			else:
 				raise ValueError(f'Unexpected value received for argument `if_exists`. ')
 		
+		parent = self.parent
+		depth = 0 if parent is None else parent._depth + 1
 		create_run(
 			path_where_to_create_the_run = self.path_to_run_directory.parent,
 			run_name = self.run_name,
+			depth = depth,
 		)
+		self._cached_packed = None
+		self._cached_recorded_depth = depth
+		if self.index is not None:
+			self.index.register_run(self.path_to_run_directory)
+		if depth == 0:
+			publish('run created', self.path_to_run_directory)
+		else:
+			publish('subrun created', self.path_to_run_directory, task_name=self.path_to_run_directory.parent.parent.name)
 	
-	def handle_task(self, task_name:str, drop_old_data:bool=True, backup_this_python_file:bool=True, allowed_exceptions:set=None):
+	def pack(self, compress:bool=False)->Path:
+		"""Packs the whole content of this run, including all its tasks
+		and subruns, into a single archive within the run directory. This
+		is useful for finished runs that contain many small files, which
+		may exhaust the number of inodes in a file system and are slow to
+		list. A packed run can still be read with `exists`, `list_subruns_of_task`,
+		`was_task_run_successfully`, `read_task_report`, `walk`, `gather`,
+		`read_script_backup` and the files within `path_to_directory_of_task`,
+		but nothing can be written into it. Use `unpack` to go back to 
+		normal. Runs containing subruns that are already packed cannot
+		be packed, unpack those first.
+		
+		Arguments
+		---------
+		compress: bool, default False
+			If `True` the files are compressed, otherwise they are just
+			stored, which is faster to read.
+		
+		Returns
+		-------
+		path_to_pack: Path
+			Path to the archive.
+		"""
+		if self._packed is not None:
+			raise RuntimeError(f'Run {self.pseudopath} located in {self.path_to_run_directory} is already packed.')
+		if not self.exists():
+			raise RuntimeError(f'Cannot pack run {repr(self.run_name)} in {self.path_to_run_directory} because it does not exist.')
+		runs = list(self.walk())
+		unfinished_tasks = [f'{pseudopath}/{task_name}' for pseudopath,run,tasks in runs for task_name in tasks if path_to_report_of_task(run.path_to_directory_of_task(task_name)) is None]
+		if len(unfinished_tasks) > 0:
+			raise RuntimeError(f'Cannot pack run {self.pseudopath} because the task(s) {unfinished_tasks} have not finished.')
+		packed_subruns = [str(pseudopath) for pseudopath,run,_ in runs if run._packed is not None and run._packed[1] == ''] # Their contents would be stored as an opaque file, hiding them.
+		if len(packed_subruns) > 0:
+			raise RuntimeError(f'Cannot pack run {self.pseudopath} because the subrun(s) {packed_subruns} are already packed, unpack them first.')
+		path_to_pack = pack_run(
+			self.path_to_run_directory,
+			compress = compress,
+			skip = {INDEX_FILE_NAME, f'{INDEX_FILE_NAME}-journal', f'{INDEX_FILE_NAME}-wal', f'{INDEX_FILE_NAME}-shm', trash.TRASH_DIRECTORY_NAME},
+		)
+		self._cached_packed = (open_pack(self.path_to_run_directory), '')
+		return path_to_pack
+	
+	def unpack(self):
+		"""Restores the directories and files of a run that was packed
+		with `pack`, so it can be written again."""
+		if self._packed is None:
+			raise RuntimeError(f'Run {self.pseudopath} located in {self.path_to_run_directory} is not packed.')
+		if self._packed[1] != '':
+			raise RuntimeError(f'Run {self.pseudopath} is within the packed run located in {self._packed[0].path_to_run}, unpack that one instead.')
+		unpack_run(self.path_to_run_directory)
+		self._cached_packed = None
+	
+	def rebuild_index(self)->BureaucratIndex:
+		"""Scans the whole tree this run belongs to (starting from its
+		root run) and (re)creates the `BureaucratIndex` from what is found
+		in the file system. This can be used on old data, or if for some
+		reason the index got out of sync. Once the index exists, all
+		the bureaucrats working in the tree will keep it updated.
+		
+		Returns
+		-------
+		index: BureaucratIndex
+			The index, ready to be queried.
+		"""
+		root = self.root
+		if not root.exists():
+			raise RuntimeError(f'Cannot create an index for run {repr(root.run_name)} in {root.path_to_run_directory} because it does not exist.')
+		index = BureaucratIndex(root.path_to_run_directory)
+		index.create()
+		runs = []
+		tasks = []
+		runs_to_scan = [root.path_to_run_directory]
+		while len(runs_to_scan) > 0:
+			path_to_run = runs_to_scan.pop()
+			runs.append((path_to_run, os.stat(path_to_run/'bureaucrat_run_info.txt').st_mtime))
+			with os.scandir(path_to_run) as entries:
+				for entry in entries:
+					if not entry.is_dir() or is_bureaucrat_internal(entry.name):
+						continue
+					path_to_report = path_to_report_of_task(entry.path)
+					if path_to_report is not None:
+						finished = os.stat(path_to_report).st_mtime
+						status = 'successful' if was_task_completed_successfully(entry.path) else 'failed'
+					else:
+						finished = None
+						status = 'running'
+					tasks.append((path_to_run, entry.name, status, None, finished))
+					try:
+						with os.scandir(Path(entry.path)/'subruns') as subruns:
+							runs_to_scan += [Path(subrun.path) for subrun in subruns if subrun.is_dir() and exists_run(Path(entry.path)/'subruns', subrun.name)]
+					except FileNotFoundError:
+						pass
+		index.replace_all(runs=runs, tasks=tasks)
+		self._index = index
+		return index
+	
+	def empty_trash(self)->int:
+		"""Deletes anything that was left in the trash directories of this
+		run and all its subruns, e.g. by a process that crashed before
+		finishing a deletion in background (see `delete_in_background`
+		in `create_run` and `handle_task`), and removes the then empty
+		trash directories.
+		
+		Returns
+		-------
+		n_deleted: int
+			The number of things that were deleted from the trash.
+		"""
+		n_deleted = trash.empty_trash_in(self.path_to_run_directory.parent)
+		for _, run, _ in self.walk():
+			n_deleted += trash.empty_trash_in(run.path_to_run_directory)
+			for path_to_subruns in run.path_to_run_directory.glob('*/subruns'):
+				n_deleted += trash.empty_trash_in(path_to_subruns)
+		return n_deleted
+	
+	def disk_usage(self, by:str='task', recursive:bool=True, max_workers:int=16)->dict:
+		"""Computes how much disk space is used by this run and its subruns.
+		The tree is scanned using a pool of threads, and the size of each
+		task that has finished is cached within its directory, so later
+		calls only scan again the tasks that were run again since then.
+		All sizes are inclusive, i.e. the size of a task includes its
+		subruns and the size of a run includes its tasks.
+		
+		Arguments
+		---------
+		by: str, default 'task'
+			If `'task'`, the result is a dictionary of the form `{(pseudopath, task_name): n_bytes}`.
+			If `'subrun'`, the result is a dictionary of the form `{pseudopath: n_bytes}`.
+		recursive: bool, default True
+			If `True`, every task (or run) in the tree is reported. If `False`
+			only the tasks of this run (or this run and its direct subruns).
+		max_workers: int, default 16
+			Number of threads used to scan the file system.
+		
+		Returns
+		-------
+		disk_usage: dict
+			Number of bytes used, see `by`.
+		"""
+		OPTIONS_FOR_BY = {'task','subrun'}
+		if by not in OPTIONS_FOR_BY:
+			raise ValueError(f'`by` must be one of {OPTIONS_FOR_BY}, received {repr(by)}. ')
+		runs = list(self.walk(max_workers=max_workers))
+		
+		def scan(run:RunBureaucrat, tasks_names:list)->tuple:
+			if run._packed is not None and run._packed[1] != '': # Everything is in the archive, which is accounted to the packed run.
+				return 0, {task_name: 0 for task_name in tasks_names}
+			other_bytes = 0
+			with os.scandir(run.path_to_run_directory) as entries:
+				for entry in entries:
+					if entry.name in tasks_names:
+						continue
+					other_bytes += bytes_used_by(entry.stat(follow_symlinks=False))
+					if entry.is_dir(follow_symlinks=False):
+						other_bytes += bytes_in_directory(entry.path)
+			if run._packed is not None:
+				return other_bytes, {task_name: 0 for task_name in tasks_names}
+			return other_bytes, {task_name: bytes_in_directory_of_task(run.path_to_directory_of_task(task_name), path_to_report_of_task(run.path_to_directory_of_task(task_name))) for task_name in tasks_names}
+		
+		with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+			scanned = list(executor.map(lambda x: scan(x[1], list(x[2])), runs))
+		
+		bytes_of_tasks = {}
+		bytes_of_runs = {}
+		for (pseudopath,run,_),(other_bytes,bytes_of_tasks_of_this_run) in zip(runs, scanned):
+			for task_name,n_bytes in bytes_of_tasks_of_this_run.items():
+				bytes_of_tasks[(run.path_to_run_directory, task_name)] = n_bytes
+		for (pseudopath,run,_),(other_bytes,bytes_of_tasks_of_this_run) in sorted(zip(runs, scanned), key=lambda x: len(x[0][0].parts), reverse=True):
+			bytes_of_runs[run.path_to_run_directory] = other_bytes + sum(bytes_of_tasks[(run.path_to_run_directory, task_name)] for task_name in bytes_of_tasks_of_this_run)
+			parent_task = (run.path_to_run_directory.parent.parent.parent, run.path_to_run_directory.parent.parent.name)
+			if run.path_to_run_directory != self.path_to_run_directory and parent_task in bytes_of_tasks:
+				bytes_of_tasks[parent_task] += bytes_of_runs[run.path_to_run_directory]
+		
+		depth = len(self.pseudopath.parts)
+		if by == 'task':
+			return {
+				(pseudopath, task_name): bytes_of_tasks[(run.path_to_run_directory, task_name)]
+				for pseudopath,run,tasks in runs for task_name in tasks
+				if recursive == True or run.path_to_run_directory == self.path_to_run_directory
+			}
+		return {
+			pseudopath: bytes_of_runs[run.path_to_run_directory]
+			for pseudopath,run,_ in runs
+			if recursive == True or len(pseudopath.parts) <= depth + 1
+		}
+	
+	def prune(self, failed_tasks:bool=False, older_than:datetime.timedelta=None, files_matching:str=None, larger_than:int=None, tasks_names:list=None, dry_run:bool=True, delete_in_background:bool=False)->list:
+		"""Deletes stuff from this run and all its subruns according to
+		a policy, to free disk space. Tasks that are still running are
+		never touched. By default this is a dry run, i.e. it only reports
+		what would be deleted. Usage example:
+		```
+		for path,n_bytes in bureaucrat.prune(failed_tasks=True, files_matching='*.raw', larger_than=2**30):
+			print(f'Would delete {path} ({n_bytes/2**30:.1f} GiB)')
+		bureaucrat.prune(failed_tasks=True, files_matching='*.raw', larger_than=2**30, dry_run=False)
+		```
+		
+		Arguments
+		---------
+		failed_tasks: bool, default False
+			If `True`, the directories of the tasks that failed are deleted,
+			including their subruns.
+		older_than: datetime.timedelta, default None
+			If given, the directories of the tasks that finished longer
+			than this ago are deleted, including their subruns.
+		files_matching: str, default None
+			If given, the files within the tasks whose name matches this
+			pattern (e.g. `'*.raw'`) are deleted. The files of the bureaucrat
+			are never deleted.
+		larger_than: int, default None
+			If given, only files larger than this number of bytes are
+			deleted. If given without `files_matching`, any file larger
+			than this is deleted.
+		tasks_names: list of str, default None
+			If given, only these tasks are considered.
+		dry_run: bool, default True
+			If `True` nothing is deleted.
+		delete_in_background: bool, default False
+			If `True` the directories of the tasks are moved to the trash
+			and deleted in background, see `handle_task`.
+		
+		Returns
+		-------
+		deleted: list of tuple
+			A list of `(path, n_bytes)` with the things that were deleted,
+			or would be deleted if `dry_run` is `True`.
+		"""
+		if not failed_tasks and older_than is None and files_matching is None and larger_than is None:
+			raise ValueError(f'No policy was given, so there is nothing to prune. Use at least one of `failed_tasks`, `older_than`, `files_matching` or `larger_than`.')
+		now = datetime.datetime.now()
+		tasks_to_delete = []
+		files_to_delete = []
+		for pseudopath,run,tasks in self.walk(tasks_names=tasks_names):
+			if run._packed is not None:
+				continue
+			for task_name,was_successful in tasks.items():
+				path_to_task = run.path_to_directory_of_task(task_name)
+				path_to_report = path_to_report_of_task(path_to_task)
+				if path_to_report is None: # Still running, or died without a report, better not to touch it.
+					continue
+				if failed_tasks == True and was_successful == False:
+					tasks_to_delete.append((run, task_name))
+					continue
+				if older_than is not None:
+					report = read_task_report(path_to_task)
+					finished = datetime.datetime.fromisoformat(report['finished']) if 'finished' in report else datetime.datetime.fromtimestamp(os.stat(path_to_report).st_mtime)
+					if now - finished > older_than:
+						tasks_to_delete.append((run, task_name))
+						continue
+				if files_matching is not None or larger_than is not None:
+					directories_to_scan = [path_to_task]
+					while len(directories_to_scan) > 0:
+						directory = directories_to_scan.pop()
+						with os.scandir(directory) as entries:
+							for entry in entries:
+								if entry.name.startswith('bureaucrat_') or is_bureaucrat_internal(entry.name):
+									continue
+								if entry.is_dir(follow_symlinks=False):
+									if not (directory == path_to_task and entry.name == 'subruns'):
+										directories_to_scan.append(Path(entry.path))
+									continue
+								if files_matching is not None and not fnmatch.fnmatch(entry.name, files_matching):
+									continue
+								n_bytes = bytes_used_by(entry.stat(follow_symlinks=False))
+								if larger_than is not None and n_bytes <= larger_than:
+									continue
+								files_to_delete.append((run, task_name, Path(entry.path), n_bytes))
+		
+		paths_to_tasks_to_delete = {run.path_to_directory_of_task(task_name) for run,task_name in tasks_to_delete}
+		is_within_deleted_task = lambda p: any(parent in paths_to_tasks_to_delete for parent in p.parents)
+		tasks_to_delete = [(run,task_name) for run,task_name in tasks_to_delete if not is_within_deleted_task(run.path_to_directory_of_task(task_name))]
+		files_to_delete = [(run,task_name,p,n_bytes) for run,task_name,p,n_bytes in files_to_delete if not is_within_deleted_task(p)]
+		
+		deleted = []
+		for run,task_name in tasks_to_delete:
+			path_to_task = run.path_to_directory_of_task(task_name)
+			deleted.append((path_to_task, bytes_in_directory(path_to_task)))
+			if dry_run == True:
+				continue
+			if run.index is not None:
+				run.index.forget_task(run.path_to_run_directory, task_name)
+			if delete_in_background == True:
+				trash.delete_in_background(path_to_task)
+			else:
+				delete_directory_and_or_file_and_subtree(path_to_task)
+		for run,task_name,p,n_bytes in files_to_delete:
+			deleted.append((p, n_bytes))
+			if dry_run == True:
+				continue
+			delete_directory_and_or_file_and_subtree(p)
+			forget_cached_disk_usage(run.path_to_directory_of_task(task_name))
+		return deleted
+	
+	def fingerprint_of_task(self, parameters:dict=None, upstream_tasks:list=None, path_to_script:Path=None)->dict:
+		"""Computes the fingerprint of a task, used by `handle_task(..., incremental=True)`
+		to decide whether a task has to be run again. See `handle_task`
+		for the meaning of the arguments."""
+		if isinstance(upstream_tasks, (str,tuple)):
+			upstream_tasks = [upstream_tasks]
+		upstream = {}
+		for upstream_task in upstream_tasks or []:
+			run, task_name = (self, upstream_task) if isinstance(upstream_task, str) else upstream_task
+			path_to_task = run.path_to_directory_of_task(task_name)
+			upstream[Path(os.path.relpath(path_to_task, self.path_to_run_directory)).as_posix()] = _signature_of_task_report(path_to_task)
+		return {
+			'script_sha256': None if path_to_script is None else read_script_once(path_to_script)[0],
+			'parameters': json.loads(json.dumps(parameters or {}, sort_keys=True, default=repr)),
+			'upstream_tasks': upstream,
+		}
+	
+	def _reasons_why_task_is_stale(self, task_name:str, fingerprint:dict)->list:
+		if not self.was_task_run_successfully(task_name):
+			return [f'task {repr(task_name)} was not run successfully before']
+		recorded = read_fingerprint_of_task(self.path_to_directory_of_task(task_name))
+		if recorded is None:
+			return [f'there is no fingerprint recorded for task {repr(task_name)}']
+		reasons = []
+		if recorded.get('script_sha256') != fingerprint['script_sha256']:
+			reasons.append('the script changed')
+		recorded_parameters = recorded.get('parameters', {})
+		for name in sorted(set(recorded_parameters)|set(fingerprint['parameters'])):
+			if recorded_parameters.get(name) != fingerprint['parameters'].get(name):
+				reasons.append(f'parameter {repr(name)} changed from {repr(recorded_parameters.get(name))} to {repr(fingerprint["parameters"].get(name))}')
+		recorded_upstream = recorded.get('upstream_tasks', {})
+		for path_to_task in sorted(set(recorded_upstream)|set(fingerprint['upstream_tasks'])):
+			if path_to_task not in recorded_upstream:
+				reasons.append(f'upstream task {repr(path_to_task)} was added')
+			elif path_to_task not in fingerprint['upstream_tasks']:
+				reasons.append(f'upstream task {repr(path_to_task)} was removed')
+			elif fingerprint['upstream_tasks'][path_to_task] is None:
+				reasons.append(f'upstream task {repr(path_to_task)} is not completed successfully')
+			elif recorded_upstream[path_to_task] != fingerprint['upstream_tasks'][path_to_task]:
+				reasons.append(f'upstream task {repr(path_to_task)} was run again')
+		return reasons
+	
+	def why_is_task_stale(self, task_name:str, parameters:dict=None, upstream_tasks:list=None, path_to_script:Path=None)->list:
+		"""Tells why a task would be run again by `handle_task(..., incremental=True)`.
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task.
+		parameters: dict, default None
+			The parameters the task would be run with.
+		upstream_tasks: list, default None
+			The upstream tasks, see `handle_task`.
+		path_to_script: Path, default None
+			The script that would run the task. If `None`, the file from
+			where this method is called is used.
+		
+		Returns
+		-------
+		reasons: list of str
+			A list with human readable reasons. If it is empty, the task
+			is up to date and would be skipped.
+		"""
+		if path_to_script is None:
+			path_to_script = path_to_script_of_caller()
+		return self._reasons_why_task_is_stale(
+			task_name,
+			self.fingerprint_of_task(parameters=parameters, upstream_tasks=upstream_tasks, path_to_script=path_to_script),
+		)
+	
+	def gather(self, task_name:str, subtask_name:str, file_name:str, reader=None, recursive:bool=False, max_workers:int=16, use_cache:bool=True, cache_key:str=None):
+		"""Reads a file produced by `subtask_name` in each of the subruns
+		of `task_name` and concatenates everything into a single data frame,
+		with two additional columns `'pseudopath'` and `'run_name'` telling
+		where each row comes from. Usage example:
+		```
+		data_df = a_run_bureaucrat.gather(
+			task_name = 'measure_black_box_sweeping_A',
+			subtask_name = 'measure_black_box_many_times',
+			file_name = 'results.csv',
+		)
+		```
+		The files are read concurrently, and the result for each file is
+		cached within the directory of `task_name`, so next time only the
+		files that changed (or whose task was run again) are read.
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task, in this run, whose subruns are gathered.
+		subtask_name: str
+			The name of the task, in each subrun, that produced the file.
+		file_name: str
+			The name of the file within the directory of `subtask_name`.
+		reader: callable, default `pandas.read_csv`
+			A function that receives a `Path` to the file and returns a
+			`pandas.DataFrame`. For runs that were packed (see `pack`) it
+			receives a `zipfile.Path` instead, whose `open` method gives
+			a file object. Results are cached per name of the reader,
+			so use `use_cache=False` if you change what a reader does. 
+			Readers without a name of their own, i.e. lambdas, functions
+			defined within other functions, `functools.partial`, etc. are
+			not cached unless a `cache_key` is given.
+		recursive: bool, default False
+			If `False`, all the subruns of `task_name` must have `subtask_name`
+			completed successfully, otherwise a `RuntimeError` is raised.
+			If `True`, all the subruns at any depth below `task_name` that
+			have `subtask_name` are gathered.
+		max_workers: int, default 16
+			Number of threads used to read the files.
+		use_cache: bool, default True
+			Whether to use and update the cache or not.
+		cache_key: str, default None
+			A name for what the `reader` does, used instead of the name
+			of the reader to tell its cached results apart. Readers that
+			read the same files differently must have different keys.
+		
+		Returns
+		-------
+		gathered_df: pandas.DataFrame
+			All the data together.
+		"""
+		import pandas
+		if reader is None:
+			reader = _read_csv
+		self.check_these_tasks_were_run_successfully(task_name)
+		if self._packed is not None: # The cache cannot be written into the archive.
+			use_cache = False
+		
+		sources = [] # List of `(pseudopath, run)`.
+		for subrun in self.list_subruns_of_task(task_name):
+			if recursive == True:
+				for pseudopath, run, tasks in subrun.walk(tasks_names=[subtask_name]):
+					if tasks[subtask_name] == False:
+						raise RuntimeError(f"Task {repr(subtask_name)} wasn't successfully run beforehand on run {pseudopath} located in {run.path_to_run_directory}.")
+					sources.append((pseudopath, run))
+			else:
+				subrun.check_these_tasks_were_run_successfully(subtask_name)
+				sources.append((subrun.pseudopath, subrun))
+		
+		if cache_key is None:
+			qualname = getattr(reader, '__qualname__', None)
+			if qualname is None or '<' in qualname: # E.g. `<lambda>` or `some_function.<locals>.reader`, which do not tell readers apart.
+				use_cache = False
+			else:
+				cache_key = f'{getattr(reader, "__module__", None)}.{qualname}'
+		path_to_cache = self.path_to_directory_of_task(task_name)/GATHER_CACHE_DIRECTORY_NAME/(hashlib.sha1(repr((subtask_name, file_name, cache_key, recursive)).encode()).hexdigest() + '.pickle')
+		cache = {}
+		if use_cache == True:
+			try:
+				with open(path_to_cache, 'rb') as ifile:
+					cache = pickle.load(ifile)
+			except Exception: # No cache, or corrupt, nothing to do.
+				pass
+		
+		def read(pseudopath:Path, run:RunBureaucrat):
+			path_to_file = run.path_to_directory_of_task(subtask_name)/file_name
+			path_to_report = path_to_report_of_task(run.path_to_directory_of_task(subtask_name))
+			signature = (_signature_of_file(path_to_file), None if path_to_report is None else _signature_of_file(path_to_report))
+			key = (Path(os.path.relpath(run.path_to_run_directory, self.path_to_run_directory))/subtask_name/file_name).as_posix()
+			if key in cache and cache[key][0] == signature:
+				return key, signature, cache[key][1], False
+			df = reader(path_to_file)
+			df['pseudopath'] = str(pseudopath)
+			df['run_name'] = run.run_name
+			return key, signature, df, True
+		
+		with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+			results = list(executor.map(lambda source: read(*source), sources))
+		
+		if use_cache == True:
+			new_cache = {key: (signature, df) for key,signature,df,_ in results}
+			if any(was_read for *_,was_read in results) or set(new_cache) != set(cache):
+				path_to_cache.parent.mkdir(exist_ok=True)
+				path_to_temporary_file = path_to_cache.with_name(f'{path_to_cache.name}.{os.getpid()}.tmp')
+				with open(path_to_temporary_file, 'wb') as ofile:
+					pickle.dump(new_cache, ofile)
+				os.replace(path_to_temporary_file, path_to_cache)
+		
+		if len(results) == 0:
+			return pandas.DataFrame()
+		return pandas.concat([df for _,_,df,_ in results], ignore_index=True)
+	
+	def merge_profiles_of_subruns(self, task_name:str, subtask_name:str=None):
+		"""Merges the CPU profiles of all the tasks within all the subruns
+		(recursively) of a task, see `profile` in `handle_task`. This
+		gives the aggregated hot spots of e.g. a whole sweep. Usage example:
+		```
+		stats = a_run_bureaucrat.merge_profiles_of_subruns('sweep')
+		stats.sort_stats('cumulative').print_stats(20)
+		```
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task whose subruns are considered.
+		subtask_name: str, default None
+			If given, only the profiles of the tasks with this name in
+			the subruns are merged.
+		
+		Returns
+		-------
+		stats: pstats.Stats
+			The merged profile.
+		"""
+		paths_to_profiles = []
+		for subrun in self.list_subruns_of_task(task_name):
+			for _, run, tasks in subrun.walk(tasks_names=None if subtask_name is None else [subtask_name]):
+				for name in tasks:
+					path_to_profile = run.path_to_directory_of_task(name)/CPU_PROFILE_FILE_NAME
+					if path_to_profile.is_file():
+						paths_to_profiles.append(str(path_to_profile))
+		if len(paths_to_profiles) == 0:
+			raise FileNotFoundError(f'There are no CPU profiles in the subruns of task {repr(task_name)} of run {self.pseudopath} located in {self.path_to_run_directory}.')
+		import pstats
+		return pstats.Stats(*paths_to_profiles)
+	
+	def read_script_backup(self, task_name:str)->bytes:
+		"""Returns the content of the script that was backed up in a task,
+		resolving it from the script store if it was backed up with 
+		`script_backup_mode='deduplicated'`.
+		
+		Arguments
+		---------
+		task_name: str
+			The name of the task.
+		"""
+		path_to_task = self.path_to_directory_of_task(task_name)
+		backups = sorted([p for p in path_to_task.iterdir() if p.name.startswith('backup.')], key=lambda p: p.name) if path_to_task.is_dir() else []
+		if len(backups) == 0:
+			raise FileNotFoundError(f'There is no backup of any script in task {repr(task_name)} of run {self.pseudopath} located in {self.path_to_run_directory}.')
+		content = backups[0].read_bytes()
+		header = SCRIPT_STORE_POINTER_HEADER.encode()
+		if content.startswith(header):
+			sha256 = content[len(header):].split()[0].decode()
+			content = (self.root._readable_run_directory/SCRIPT_STORE_DIRECTORY_NAME/sha256).read_bytes()
+		return content
+	
+	def handle_task(self, task_name:str, drop_old_data:bool=True, backup_this_python_file:bool=True, allowed_exceptions:set=None, script_backup_mode:str='copy', delete_in_background:bool=False, incremental:bool=False, parameters:dict=None, upstream_tasks:list=None, profile:str=None, exclusive:bool=False):
 		"""This method is used to create a new "subordinate bureaucrat" 
 		of type `TaskBureaucrat` that will manage a task (instead of a
 		run) within the run being managed by the current `RunBureaucrat`.
@@ -255,24 +1354,152 @@ class RunBureaucrat:
 			for example you may want that if you manualy stop the execution
 			that is not an error so you then `allowed_exceptions={KeyboardInterrupt}`
 			would handle that.
+		script_backup_mode: str, default 'copy'
+			How to back up the python file, if `backup_this_python_file`.
+			Options are:
+			- `'copy'`: A copy of the file is created in the task directory.
+			- `'deduplicated'`: The file is stored only once in a content
+			addressed store within the root run, and the task directory
+			gets a hard link to it (or a small pointer file if hard links
+			are not possible). Use `read_script_backup` to read it back.
+		delete_in_background: bool, default False
+			Only relevant if `drop_old_data`. If `True`, the old data is
+			moved into a trash directory (which is instantaneous) and
+			then deleted in a background thread, so the task can start
+			right away.
+		incremental: bool, default False
+			If `True`, a fingerprint made of the hash of the python file,
+			the `parameters` and the state of the `upstream_tasks` is 
+			recorded in the task report. If the task was already completed
+			successfully with the same fingerprint, nothing is touched 
+			and the `was_skipped` attribute of the `TaskBureaucrat` is set
+			to `True`, so the task can be skipped like this:
+			```
+			with a_run_bureaucrat.handle_task('some_task', incremental=True) as employee:
+				if not employee.was_skipped:
+					blah blah blah
+			```
+			Writing into a skipped task, e.g. through `path_to_directory_of_my_task`,
+			raises `RuntimeError` so the old results are never mixed with
+			new ones. Use `why_is_task_stale` to know why a task is going to be run.
+		parameters: dict, default None
+			Only relevant if `incremental`. A dictionary with the parameters
+			that determine the result of the task. Values must be JSON
+			serializable, otherwise their `repr` is used.
+		upstream_tasks: list, default None
+			Only relevant if `incremental`. The tasks whose results are used
+			by this task. Each item is either the name of a task within
+			this same run, or a tuple `(RunBureaucrat, task_name)` for 
+			tasks in other runs. If any of them is run again, this task
+			becomes stale.
+		profile: str, default None
+			If given, the body of the `with` statement is profiled and the 
+			results are stored in the task directory. Options are `'cpu'`
+			(using `cProfile`, stored in a `.prof` file that can be opened
+			with `pstats` or e.g. `snakeviz`), `'memory'` (using `tracemalloc`,
+			a summary of the top allocations is stored in a text file) or
+			`'both'`. If `None`, the value of the environment variable
+			`BUREAUCRAT_PROFILE` is used, if it is set. See also `merge_profiles_of_subruns`.
+		exclusive: bool, default False
+			If `True`, the task is claimed with a lease (see `the_bureaucrat.leases`)
+			so no other process, in this or any other computer sharing
+			the file system, can handle it at the same time. If it is
+			already being handled by someone else, a `RuntimeError` is
+			raised when entering the `with` statement, before anything
+			is touched. A lease whose holder died is taken over after
+			`DEFAULT_LEASE_TTL_SECONDS`.
 		
 		Returns
 		-------
 		new_bureaucrat: TaskBureaucrat
 			A bureaucrat to handle the task.
 		"""
+		return self._hire_task_bureaucrat(
+			task_name = task_name,
+			caller_depth = 2,
+			drop_old_data = drop_old_data,
+			backup_this_python_file = backup_this_python_file,
+			allowed_exceptions = allowed_exceptions,
+			script_backup_mode = script_backup_mode,
+			delete_in_background = delete_in_background,
+			incremental = incremental,
+			parameters = parameters,
+			upstream_tasks = upstream_tasks,
+			profile = profile if profile is not None else os.environ.get('BUREAUCRAT_PROFILE') or None,
+			exclusive = exclusive,
+		)
+	
+	def _hire_task_bureaucrat(self, task_name:str, caller_depth:int, drop_old_data:bool, backup_this_python_file:bool, allowed_exceptions:set, script_backup_mode:str, delete_in_background:bool, incremental:bool, parameters:dict, upstream_tasks:list, profile:str, exclusive:bool):
+		"""Creates the `TaskBureaucrat` for `handle_task` and `ahandle_task`.
+		`caller_depth` tells how far up in the stack is the script that
+		wants the task to be handled, see `path_to_script_of_caller`."""
 		if len(find_ugly_characters_better_to_avoid_in_paths(task_name)) != 0:
 			warnings.warn(f'Your `task_name` is {repr(task_name)} and contains the character/s {find_ugly_characters_better_to_avoid_in_paths(task_name)} which is better to avoid, as this is going to be a path in the file system.')
-		return TaskBureaucrat(
+		path_to_calling_script = path_to_script_of_caller(depth=caller_depth)
+		new_bureaucrat = TaskBureaucrat(
 			path_to_the_run = self.path_to_run_directory,
 			task_name = task_name,
 			drop_old_data = drop_old_data,
-			path_to_script_to_backup = Path(traceback.extract_stack()[-2].filename),
+			path_to_script_to_backup = path_to_calling_script if backup_this_python_file == True else None,
 			allowed_exceptions = allowed_exceptions,
+			script_backup_mode = script_backup_mode,
+			delete_in_background = delete_in_background,
+			fingerprint = self.fingerprint_of_task(parameters=parameters, upstream_tasks=upstream_tasks, path_to_script=path_to_calling_script) if incremental == True else None,
+			profile = profile,
+			exclusive = exclusive,
+		)
+		if hasattr(self, '_root'):
+			new_bureaucrat._root = self._root
+		return new_bureaucrat
+	
+	async def acreate_run(self, if_exists:str='raise error', delete_in_background:bool=False):
+		"""Same as `create_run` but without blocking the event loop."""
+		await _offload(self.create_run, if_exists=if_exists, delete_in_background=delete_in_background)
+	
+	async def awas_task_run_successfully(self, task_name:str)->bool:
+		"""Same as `was_task_run_successfully` but without blocking the event loop."""
+		return await _offload(self.was_task_run_successfully, task_name)
+	
+	async def acheck_these_tasks_were_run_successfully(self, tasks_names:list, raise_error:bool=True)->bool:
+		"""Same as `check_these_tasks_were_run_successfully` but without blocking the event loop."""
+		return await _offload(self.check_these_tasks_were_run_successfully, tasks_names, raise_error=raise_error)
+	
+	async def alist_subruns_of_task(self, task_name:str)->list:
+		"""Same as `list_subruns_of_task` but without blocking the event loop."""
+		return await _offload(self.list_subruns_of_task, task_name)
+	
+	def ahandle_task(self, task_name:str, drop_old_data:bool=True, backup_this_python_file:bool=True, allowed_exceptions:set=None, script_backup_mode:str='copy', delete_in_background:bool=False, incremental:bool=False, parameters:dict=None, upstream_tasks:list=None, exclusive:bool=False):
+		"""Same as `handle_task` but to be used with `async with`, e.g.
+		```
+		async with a_run_bureaucrat.ahandle_task('some_task') as subordinated_task_bureaucrat:
+			blah blah blah
+		```
+		All the work of the bureaucrat when entering and exiting (dropping
+		old data, writing the report, the backup of the script, etc.) is
+		done in a pool of threads, so the event loop is not blocked and
+		many tasks can be handled concurrently from it. The pool has at
+		most `ASYNC_MAX_WORKERS` threads. The option `profile` of `handle_task`
+		is not available, because it works by hooking into the thread
+		that runs the body of the `with` statement. For the meaning of 
+		the arguments see `handle_task`.
+		"""
+		return self._hire_task_bureaucrat(
+			task_name = task_name,
+			caller_depth = 2,
+			drop_old_data = drop_old_data,
+			backup_this_python_file = backup_this_python_file,
+			allowed_exceptions = allowed_exceptions,
+			script_backup_mode = script_backup_mode,
+			delete_in_background = delete_in_background,
+			incremental = incremental,
+			parameters = parameters,
+			upstream_tasks = upstream_tasks,
+			profile = None,
+			exclusive = exclusive,
 		)
 	
 class TaskBureaucrat(RunBureaucrat):
-	def __init__(self, path_to_the_run:Path, task_name:str, drop_old_data:bool=True, path_to_script_to_backup:Path=None, allowed_exceptions:set=None):
+	def __init__(self, path_to_the_run:Path, task_name:str, drop_old_data:bool=True, path_to_script_to_backup:Path=None, allowed_exceptions:set=None, script_backup_mode:str='copy', delete_in_background:bool=False, fingerprint:dict=None, profile:str=None, exclusive:bool=False):
 		"""Create a `TaskBureaucrat`.
 		
 		Arguments
@@ -290,13 +1517,38 @@ class TaskBureaucrat(RunBureaucrat):
 			for example you may want that if you manualy stop the execution
 			that is not an error so you then `allowed_exceptions={KeyboardInterrupt}`
 			would handle that.
+		script_backup_mode: str, default 'copy'
+			Either `'copy'` or `'deduplicated'`, see `RunBureaucrat.handle_task`.
+		delete_in_background: bool, default False
+			If `True`, the old data is deleted in background, see `RunBureaucrat.handle_task`.
+		fingerprint: dict, default None
+			If given, it is recorded in the task report and, if the task
+			was already completed successfully with the same fingerprint,
+			nothing is touched and `was_skipped` is set to `True`. See 
+			`RunBureaucrat.handle_task` with `incremental=True`.
+		profile: str, default None
+			Either `None`, `'cpu'`, `'memory'` or `'both'`, see `RunBureaucrat.handle_task`.
+		exclusive: bool, default False
+			If `True`, the task is claimed with a lease, see `RunBureaucrat.handle_task`.
 		"""
-		if not exists_run(path_to_the_run.parent, path_to_the_run.parts[-1]):
-			raise ValueError(f'`path_to_the_run` is {path_to_the_run} which does not look like the directory of a run...')
+		OPTIONS_FOR_PROFILE = {None,'cpu','memory','both'}
+		if profile not in OPTIONS_FOR_PROFILE:
+			raise ValueError(f'`profile` must be one of {OPTIONS_FOR_PROFILE}, received {repr(profile)}. ')
+		OPTIONS_FOR_SCRIPT_BACKUP_MODE = {'copy','deduplicated'}
+		if script_backup_mode not in OPTIONS_FOR_SCRIPT_BACKUP_MODE:
+			raise ValueError(f'`script_backup_mode` must be one of {OPTIONS_FOR_SCRIPT_BACKUP_MODE}, received {repr(script_backup_mode)}. ')
 		super().__init__(path_to_the_run=path_to_the_run)
+		if not self.exists():
+			raise ValueError(f'`path_to_the_run` is {path_to_the_run} which does not look like the directory of a run...')
 		self._task_name = task_name
 		self._drop_old_data = drop_old_data
 		self._path_to_script_to_backup = path_to_script_to_backup
+		self._script_backup_mode = script_backup_mode
+		self._delete_in_background = delete_in_background
+		self._fingerprint = fingerprint
+		self._profile = profile
+		self._exclusive = exclusive
+		self.was_skipped = False
 		self._allowed_exceptions = allowed_exceptions if allowed_exceptions is not None else {}
 	
 	@property
@@ -307,38 +1559,222 @@ class TaskBureaucrat(RunBureaucrat):
 	@property
 	def path_to_directory_of_my_task(self)->Path:
 		"""Returns a `Path` object pointing to the directory of the current
-		task."""
-		return self.path_to_directory_of_task(self.task_name)
+		task. Raises `RuntimeError` if the task was skipped, see `was_skipped`."""
+		self._raise_if_skipped()
+		if not hasattr(self, '_path_to_directory_of_my_task'): # A task that is handled is never within a packed run, see `__enter__`, so there is no need to look for one.
+			self._path_to_directory_of_my_task = self.path_to_run_directory/self.task_name
+		return self._path_to_directory_of_my_task
+	
+	def _raise_if_skipped(self):
+		"""A skipped task keeps its old results, so anything written into
+		it would mix with them. This is called by everything that gives
+		a way to write into the task, to catch a body that ignores `was_skipped`."""
+		if self.was_skipped == True:
+			raise RuntimeError(f'Task {repr(self.task_name)} in run {self.pseudopath} was skipped because it is up to date (see `was_skipped`), so nothing can be written into it. To read its results use `path_to_directory_of_task`.')
 	
 	def __enter__(self):
 		if hasattr(self, '_already_did_my_job'):
 			raise RuntimeError(f'A {TaskBureaucrat} can only be used once, and this one has already been used! If you want to do a new task just hire a new bureaucrat, it is free.')
+		if self._packed is not None:
+			raise RuntimeError(f'Cannot handle task {repr(self.task_name)} in run {self.pseudopath} because the run is packed and thus read only. Use `unpack` first.')
+		if self._exclusive == True:
+			self._lease = Lease(self.path_to_run_directory/LEASES_DIRECTORY_NAME/f'{self.task_name}.lease')
+			if not self._lease.acquire():
+				raise RuntimeError(f'Cannot handle task {repr(self.task_name)} in run {self.pseudopath} because it is being handled by another worker, {self._lease.current_owner()}.')
 		
-		if self._drop_old_data == True and self.path_to_directory_of_task(self.task_name).is_dir():
-			self.clean_directory_of_my_task()
-		self.path_to_directory_of_task(self.task_name).mkdir(exist_ok=True)
-		
+		try:
+			if self._fingerprint is not None and len(self._reasons_why_task_is_stale(self.task_name, self._fingerprint)) == 0:
+				self.was_skipped = True
+				return self
+			
+			if self._drop_old_data == True and self.path_to_directory_of_my_task.is_dir():
+				self.clean_directory_of_my_task(in_background=self._delete_in_background)
+			self.path_to_directory_of_my_task.mkdir(exist_ok=True)
+			
+			if self.index is not None:
+				if self._drop_old_data == True:
+					self.index.forget_subruns_of_task(self.path_to_run_directory, self.task_name)
+				self.index.register_task_started(self.path_to_run_directory, self.task_name)
+			publish('task started', self.path_to_run_directory, task_name=self.task_name)
+			
+			self._resources_when_started = measure_resources_used_by_this_process()
+			self._start_profiling()
+		except BaseException: # Otherwise `__exit__` is never called and the heartbeat would keep the lease until the process ends.
+			if hasattr(self, '_lease'):
+				self._lease.release()
+			raise
 		return self
+	
+	def _start_profiling(self):
+		global _active_cpu_profiler
+		self._cpu_profiler = None
+		self._started_tracemalloc = False
+		if self._profile is None:
+			return
+		import cProfile # Imported here, instead of at the top, to keep the import of this module fast.
+		import tracemalloc
+		if self._profile in {'cpu','both'}:
+			if _active_cpu_profiler is not None:
+				warnings.warn(f'Cannot profile the CPU usage of task {repr(self.task_name)} because there is already a task being profiled in this process, so its profile will include this task.')
+			else:
+				self._cpu_profiler = _active_cpu_profiler = cProfile.Profile()
+				self._cpu_profiler.enable()
+		if self._profile in {'memory','both'}:
+			self._peak_of_memory_elsewhere = 0 # Peaks that `reset_peak` took away from this task, see below.
+			self._can_reset_peak_of_memory = True
+			if not tracemalloc.is_tracing():
+				tracemalloc.start()
+				self._started_tracemalloc = True
+			elif len(_tasks_profiling_memory) == 0: # Someone else is tracing, and its peak would be lost if reset.
+				self._can_reset_peak_of_memory = False
+			if self._can_reset_peak_of_memory:
+				if len(_tasks_profiling_memory) > 0: # Keep the peak of the enclosing task.
+					outer_task = _tasks_profiling_memory[-1]
+					outer_task._peak_of_memory_elsewhere = max(outer_task._peak_of_memory_elsewhere, tracemalloc.get_traced_memory()[1])
+				tracemalloc.reset_peak()
+			_tasks_profiling_memory.append(self)
+			self._memory_snapshot_when_started = tracemalloc.take_snapshot()
+	
+	def _stop_profiling(self, number_of_top_allocations:int=30):
+		"""Stops the profilers started by `_start_profiling` and stores
+		their results in the task directory."""
+		global _active_cpu_profiler
+		if self._cpu_profiler is not None:
+			self._cpu_profiler.disable()
+			_active_cpu_profiler = None
+			self._cpu_profiler.dump_stats(self.path_to_directory_of_my_task/CPU_PROFILE_FILE_NAME)
+		if self._profile in {'memory','both'}:
+			import tracemalloc
+			snapshot = tracemalloc.take_snapshot()
+			current, peak = tracemalloc.get_traced_memory()
+			peak = max(peak, self._peak_of_memory_elsewhere)
+			_tasks_profiling_memory.remove(self)
+			if len(_tasks_profiling_memory) > 0: # Give back to the enclosing task the peak that was reset for this one.
+				outer_task = _tasks_profiling_memory[-1]
+				outer_task._peak_of_memory_elsewhere = max(outer_task._peak_of_memory_elsewhere, peak)
+			if self._started_tracemalloc:
+				tracemalloc.stop()
+			with open(self.path_to_directory_of_my_task/MEMORY_PROFILE_FILE_NAME, 'w') as ofile:
+				print(f'Memory profile of task {repr(self.task_name)} made with `tracemalloc`.', file=ofile)
+				if self._can_reset_peak_of_memory:
+					print(f'Peak traced memory during the task: {peak} bytes', file=ofile)
+				else:
+					print(f'Peak traced memory since `tracemalloc` was started outside of this task, not reset so as not to disturb whoever started it: {peak} bytes', file=ofile)
+				print(f'Top {number_of_top_allocations} allocations still alive at the end of the task, compared to its beginning:', file=ofile)
+				for statistic in snapshot.compare_to(self._memory_snapshot_when_started, 'lineno')[:number_of_top_allocations]:
+					print(statistic, file=ofile)
 		
 	def __exit__(self, exc_type, exc_value, exc_traceback):
 		self._already_did_my_job = True
 		
-		with open(self.path_to_directory_of_my_task/Path('bureaucrat_task_report.txt'), 'w') as ofile:
-			if all([exc is None for exc in [exc_type, exc_value, exc_traceback]]) or exc_type in self._allowed_exceptions: # This means there was no error, see https://docs.python.org/3/reference/datamodel.html#object.__exit__
-				print('exit_status: task completed successfully with no errors :)', file=ofile)
-				print(f'The sole purpose of this file is to indicate that this task was completed with no errors on {datetime.datetime.now()}.', file=ofile)
-			else: # If there was any kind of error...
+		try:
+			if self.was_skipped == True:
+				return
+			
+			task_was_successful = all([exc is None for exc in [exc_type, exc_value, exc_traceback]]) or exc_type in self._allowed_exceptions # This means there was no error, see https://docs.python.org/3/reference/datamodel.html#object.__exit__
+			for table in getattr(self, '_open_tables', []):
+				table.close()
+			for array in getattr(self, '_open_arrays', []):
+				array.flush()
+			self._stop_profiling()
+			self._write_report(task_was_successful, exc_type, exc_value, exc_traceback)
+			
+			if self._path_to_script_to_backup is not None:
+				path_to_backup = self.path_to_directory_of_my_task/f'backup.{self._path_to_script_to_backup.parts[-1]}'
+				try:
+					if path_to_backup.is_file(): # Never write through an existing hard link into the script store.
+						delete_directory_and_or_file_and_subtree(path_to_backup)
+					if self._script_backup_mode == 'deduplicated':
+						self._backup_script_into_store(path_to_backup)
+					else:
+						shutil.copyfile(self._path_to_script_to_backup, path_to_backup)
+				except FileNotFoundError as e:
+					warnings.warn(f'Cannot create backup of script, reason: {e}.')
+			
+			if self.index is not None:
+				self.index.register_task_finished(self.path_to_run_directory, self.task_name, successful=task_was_successful)
+			publish('task successful' if task_was_successful else 'task failed', self.path_to_run_directory, task_name=self.task_name)
+		finally: # Whatever happens, other workers must not wait for the lease to expire.
+			if hasattr(self, '_lease'):
+				self._lease.release()
+	
+	async def __aenter__(self):
+		if self._profile is not None:
+			raise RuntimeError(f'A {TaskBureaucrat} with profiling cannot be used with `async with`, use a normal `with` instead.')
+		await _offload(self.__enter__)
+		return self
+	
+	async def __aexit__(self, exc_type, exc_value, exc_traceback):
+		return await _offload(self.__exit__, exc_type, exc_value, exc_traceback)
+	
+	def _write_report(self, task_was_successful:bool, exc_type, exc_value, exc_traceback):
+		"""Writes the JSON report of the task, see `read_task_report`."""
+		started = self._resources_when_started
+		finished = measure_resources_used_by_this_process()
+		difference = lambda key: None if started[key] is None or finished[key] is None else finished[key] - started[key]
+		report = {
+			'exit_status': 'successful' if task_was_successful else 'failed',
+			'task_name': self.task_name,
+			'started': datetime.datetime.fromtimestamp(started['wall_time']).isoformat(),
+			'finished': datetime.datetime.fromtimestamp(finished['wall_time']).isoformat(),
+			'wall_time_seconds': difference('wall_time'),
+			'cpu_user_seconds': difference('cpu_user_seconds'),
+			'cpu_system_seconds': difference('cpu_system_seconds'),
+			'peak_rss_bytes': finished['peak_rss_bytes'], # This is for the whole process, up to the end of the task.
+			'io_read_bytes': difference('io_read_bytes'),
+			'io_write_bytes': difference('io_write_bytes'),
+			'host': socket.gethostname(),
+			'pid': os.getpid(),
+			'exception_type': None if exc_type is None else exc_type.__name__,
+			'exception_message': None if exc_value is None else str(exc_value),
+			'traceback': None if exc_traceback is None else ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback)),
+		}
+		if self._fingerprint is not None:
+			report['fingerprint'] = self._fingerprint
+		if hasattr(self, '_subruns_outcomes'):
+			report['subruns_outcomes'] = {subrun_name: {'successful': outcome['successful'], 'error': outcome['error']} for subrun_name,outcome in self._subruns_outcomes.items()}
+		path_to_temporary_file = self.path_to_directory_of_my_task/f'{TASK_REPORT_FILE_NAME}.{os.getpid()}.tmp'
+		with open(path_to_temporary_file, 'w') as ofile:
+			ofile.write('{\n' + ',\n'.join(f'\t{_REPORT_ENCODER.encode(key)}: {_REPORT_ENCODER.encode(value)}' for key,value in report.items()) + '\n}\n') # One key per line to be readable, as with `indent` which is much slower because it cannot use the C encoder.
+		os.replace(path_to_temporary_file, self.path_to_directory_of_my_task/TASK_REPORT_FILE_NAME)
+		with open(self.path_to_directory_of_my_task/LEGACY_TASK_REPORT_FILE_NAME, 'w') as ofile: # Written last, so older versions of `the_bureaucrat` and other tools that only read this one keep working.
+			if task_was_successful:
+				print(LEGACY_SUCCESS_MARKER, file=ofile)
+				print(f'The sole purpose of this file is to indicate that this task was completed with no errors on {report["finished"]}. The details are in {TASK_REPORT_FILE_NAME}.', file=ofile)
+			else:
 				print('exit_status: task could not be completed becasue there were errors :(', file=ofile)
-				print(f'If you are reading this it means that this script ended with errors on {datetime.datetime.now()}', file=ofile)
-				print('---', file=ofile)
-				traceback.print_tb(exc_traceback, file=ofile)
-				print(f'{exc_type.__name__}: {exc_value}', file=ofile)
-		
-		if self._path_to_script_to_backup is not None:
-			try:
-				shutil.copyfile(self._path_to_script_to_backup, self.path_to_directory_of_my_task/f'backup.{self._path_to_script_to_backup.parts[-1]}')
-			except FileNotFoundError as e:
-				warnings.warn(f'Cannot create backup of script, reason: {e}.')
+				print(f'If you are reading this it means that this script ended with errors on {report["finished"]}. The details are in {TASK_REPORT_FILE_NAME}.', file=ofile)
+				if report['traceback'] is not None:
+					print('---', file=ofile)
+					print(report['traceback'], end='', file=ofile)
+	
+	def _backup_script_into_store(self, path_to_backup:Path):
+		"""Stores the script in the content addressed store of the root
+		run, if it is not there yet, and links it from `path_to_backup`."""
+		sha256, content = read_script_once(self._path_to_script_to_backup)
+		path_to_store = self.root.path_to_run_directory/SCRIPT_STORE_DIRECTORY_NAME
+		path_to_stored_script = path_to_store/sha256
+		if not path_to_stored_script.is_file():
+			path_to_store.mkdir(exist_ok=True)
+			path_to_temporary_file = path_to_store/f'{sha256}.{os.getpid()}.tmp'
+			path_to_temporary_file.write_bytes(content)
+			path_to_temporary_file.chmod(0o444)
+			os.replace(path_to_temporary_file, path_to_stored_script)
+		try:
+			os.link(path_to_stored_script, path_to_backup)
+		except OSError:
+			with open(path_to_backup, 'w') as ofile:
+				print(f'{SCRIPT_STORE_POINTER_HEADER}{sha256}', file=ofile)
+	
+	@property
+	def _run_bureaucrat(self)->RunBureaucrat:
+		"""Returns a `RunBureaucrat` pointing to the run of this task, kept
+		so what is found out about the run (e.g. its depth) is not found
+		out again for each subrun created."""
+		if not hasattr(self, '_cached_run_bureaucrat'):
+			self._cached_run_bureaucrat = RunBureaucrat(self.path_to_run_directory)
+			self._cached_run_bureaucrat._root = self.root
+		return self._cached_run_bureaucrat
 	
 	def create_subrun(self, subrun_name:str, if_exists:str='raise error')->RunBureaucrat:
 		"""Create a subrun within the current task.
@@ -357,11 +1793,400 @@ class TaskBureaucrat(RunBureaucrat):
 		new_run_bureaucrat: RunBureaucrat
 			A newly created `RunBureaucrat` ready to handle the new subrun.
 		"""
+		self._raise_if_skipped()
 		some_bureaucrat = RunBureaucrat(path_to_the_run=self._path_to_directory_of_subruns_of_task(self.task_name)/subrun_name)
+		some_bureaucrat._root = self.root
+		some_bureaucrat._parent = self._run_bureaucrat
 		some_bureaucrat.create_run(if_exists=if_exists)
 		return some_bureaucrat
 	
-	def clean_directory_of_my_task(self):
-		"""Deletes all content in the default output directory."""
+	def create_subruns(self, subruns_names:list, if_exists:str='raise error', max_workers:int=None)->list:
+		"""Create many subruns within the current task at once, e.g. one
+		for each point of a grid sweep. This is much faster than calling
+		`create_subrun` many times, since the names are validated once,
+		the existing subruns are listed once and the index is updated once.
+		Usage example:
+		```
+		with a_run_bureaucrat.handle_task('sweep') as employee:
+			subruns = employee.create_subruns([f'voltage_{v}V' for v in voltages])
+			for v,subrun in zip(voltages, subruns):
+				...
+		```
+		
+		Arguments
+		---------
+		subruns_names: list of str
+			The names for the subruns.
+		if_exists: str, default 'raise error'
+			Determines the behavior to follow if any of the subruns already
+			exists. For available options see documentation of `RunBureaucrat.create_run`.
+			With `'raise error'` nothing is created if any of them exists.
+		max_workers: int, default None
+			If given, the subruns are created using a pool of this many
+			threads, which helps on network file systems where each
+			operation has a high latency. If `None`, they are created one
+			after the other.
+		
+		Returns
+		-------
+		new_runs_bureaucrats: list of RunBureaucrat
+			The bureaucrats of the new subruns, in the same order as `subruns_names`.
+		"""
+		OPTIONS_FOR_IF_EXISTS_ARGUMENT = {'raise error','override','skip'}
+		if if_exists not in OPTIONS_FOR_IF_EXISTS_ARGUMENT:
+			raise ValueError(f'`if_exists` must be one of {OPTIONS_FOR_IF_EXISTS_ARGUMENT}, received {repr(if_exists)}. ')
+		self._raise_if_skipped()
+		subruns_names = list(subruns_names)
+		for name in subruns_names:
+			if not isinstance(name, str) or name in {'','.','..'} or '/' in name or os.sep in name:
+				raise ValueError(f'Each element of `subruns_names` must be a valid name for a directory, received {repr(name)}. ')
+			if is_bureaucrat_internal(name):
+				raise ValueError(f'Names starting with `.bureaucrat` are reserved, received {repr(name)}. ')
+		if len(set(subruns_names)) != len(subruns_names):
+			raise ValueError(f'`subruns_names` contains repeated names. ')
+		
+		path_to_subruns = self._path_to_directory_of_subruns_of_task(self.task_name)
+		ugly_characters = find_ugly_characters_better_to_avoid_in_paths(path_to_subruns).union(*[find_ugly_characters_better_to_avoid_in_paths(name) for name in subruns_names])
+		if ugly_characters:
+			warnings.warn(f'Creating subruns in {path_to_subruns} I see their paths contain the characters {ugly_characters} which are better to avoid.')
+		path_to_subruns.mkdir(parents=True, exist_ok=True)
+		with os.scandir(path_to_subruns) as entries:
+			names_already_there = {entry.name for entry in entries}
+		existing_subruns_names = [name for name in subruns_names if name in names_already_there and exists_run(path_to_subruns, name)]
+		if len(existing_subruns_names) > 0 and if_exists == 'raise error':
+			raise RuntimeError(f'Cannot create subruns in {path_to_subruns} because {existing_subruns_names} already exist.')
+		
+		parent = self._run_bureaucrat
+		depth = parent._depth + 1
+		subruns = []
+		for name in subruns_names:
+			subrun = RunBureaucrat(path_to_subruns/name)
+			subrun._root = self.root
+			subrun._parent = parent
+			subrun._cached_packed = None
+			subruns.append(subrun)
+		
+		def create(subrun:RunBureaucrat):
+			path_to_subrun = os.path.join(path_to_subruns, subrun.run_name) # Plain strings, to save the `Path` overhead on each of possibly many subruns.
+			os.mkdir(path_to_subrun)
+			_write_run_info_file(path_to_subrun, subrun.run_name, depth)
+			subrun._cached_recorded_depth = depth
+		
+		existing_subruns_names = set(existing_subruns_names)
+		if if_exists == 'override':
+			for subrun in subruns:
+				if subrun.run_name in existing_subruns_names:
+					subrun.create_run(if_exists='override')
+		new_subruns = [subrun for subrun in subruns if subrun.run_name not in existing_subruns_names]
+		if max_workers is None:
+			for subrun in new_subruns:
+				create(subrun)
+		else:
+			with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+				list(executor.map(create, new_subruns))
+		if self.index is not None and len(new_subruns) > 0:
+			self.index.register_runs([subrun.path_to_run_directory for subrun in new_subruns])
+		for subrun in new_subruns:
+			publish('subrun created', subrun.path_to_run_directory, task_name=self.task_name)
+		return subruns
+	
+	def claim_next_subrun(self, candidates:list=None, ttl:float=DEFAULT_LEASE_TTL_SECONDS, wait:bool=False):
+		"""Claims the next subrun that nobody else is working on, so
+		many workers (processes, possibly in different computers sharing
+		the file system) can run the same script and share the subruns
+		as a queue of work. Usage example:
+		```
+		with a_run_bureaucrat.handle_task('sweep', drop_old_data=False) as employee:
+			while (lease := employee.claim_next_subrun([f'voltage_{v}V' for v in voltages])) is not None:
+				with lease:
+					with lease.subrun.handle_task('measure') as subemployee:
+						...
+		```
+		Each claim is a lease (see `the_bureaucrat.leases`) kept alive by
+		a heartbeat, so if a worker dies its subrun is claimed again by
+		another one after `ttl` seconds. When the `with lease` block exits
+		the subrun is marked as done, successful or not, and will not be
+		claimed again.
+		
+		Arguments
+		---------
+		candidates: list of str, default None
+			The names of the subruns to be done, in order. They are
+			created when claimed if they do not exist. If `None`, the
+			existing subruns of this task are used.
+		ttl: float, default 60
+			Seconds without heartbeat after which a claim is considered
+			abandoned.
+		wait: bool, default False
+			If `False`, returns `None` when every candidate is either done
+			or claimed by someone else. If `True`, in the latter case it
+			waits until either something can be claimed (e.g. a worker died)
+			or everything is done.
+		
+		Returns
+		-------
+		lease: SubrunLease
+			The claim on the subrun, or `None` if there is nothing left to do.
+		"""
+		self._raise_if_skipped()
+		if candidates is None:
+			candidates = [subrun.run_name for subrun in self.list_subruns_of_task(self.task_name)]
+		candidates = [candidate.run_name if isinstance(candidate, RunBureaucrat) else candidate for candidate in candidates]
+		path_to_leases = self._path_to_directory_of_subruns_of_task(self.task_name)/LEASES_DIRECTORY_NAME
+		while True:
+			try:
+				with os.scandir(path_to_leases) as entries:
+					files_names = {entry.name for entry in entries}
+			except FileNotFoundError:
+				files_names = set()
+			pending = [name for name in candidates if f'{name}.done' not in files_names]
+			if len(pending) == 0:
+				return None
+			for name in pending:
+				lease = SubrunLease(
+					subrun = RunBureaucrat(self._path_to_directory_of_subruns_of_task(self.task_name)/name),
+					path_to_lease = path_to_leases/f'{name}.lease',
+					path_to_done_marker = path_to_leases/f'{name}.done',
+					ttl = ttl,
+				)
+				if not lease.acquire():
+					continue
+				if lease.path_to_done_marker.is_file(): # Someone finished it since we listed the leases.
+					lease.release()
+					continue
+				lease.subrun._root = self.root
+				lease.subrun.create_run(if_exists='skip')
+				return lease
+			if wait == False:
+				return None
+			time.sleep(ttl/4)
+	
+	def open_table(self, name:str, schema:dict, chunk_size:int=2**16)->TableWriter:
+		"""Creates a table within the directory of this task where rows
+		can be appended while the task is running, e.g. one row per
+		measurement. Rows are buffered and written in chunks of `chunk_size`
+		rows, so memory usage is bounded and all the chunks already written
+		are safe even if the task crashes. The table is closed automatically
+		when the task finishes. Usage example:
+		```
+		with a_run_bureaucrat.handle_task('measure') as employee:
+			table = employee.open_table('results', {'n_measurement': 'int64', 'voltage': 'float64'})
+			for n in range(99999999):
+				table.append(n_measurement=n, voltage=measure_voltage())
+		```
+		The table can then be read with `RunBureaucrat.read_table`.
+		
+		Arguments
+		---------
+		name: str
+			The name of the table.
+		schema: dict
+			A dictionary of the form `{column_name: dtype}`.
+		chunk_size: int, default 65536
+			Number of rows in each chunk.
+		
+		Returns
+		-------
+		table: TableWriter
+			An object to append rows to the table.
+		"""
+		if not hasattr(self, '_open_tables'):
+			self._open_tables = []
+		table = TableWriter(self.path_to_directory_of_my_task/name, schema=schema, chunk_size=chunk_size)
+		self._open_tables.append(table)
+		return table
+	
+	def create_array(self, name:str, shape, dtype='float64', fortran_order:bool=False):
+		"""Creates a numpy array backed by a file in the directory of this
+		task, so it can be bigger than the available memory and whatever
+		is written into it goes directly to the file. The array is stored
+		as `{name}.npy` together with `{name}.json` describing its shape
+		and dtype. Usage example:
+		```
+		with a_run_bureaucrat.handle_task('acquire') as employee:
+			waveforms = employee.create_array('waveforms', shape=(99999,1000), dtype='float32')
+			for n in range(len(waveforms)):
+				waveforms[n] = acquire_waveform()
+		```
+		The array can later be opened with `RunBureaucrat.open_array`.
+		
+		Arguments
+		---------
+		name: str
+			The name of the array.
+		shape: int or tuple of int
+			The shape of the array.
+		dtype: numpy dtype, default 'float64'
+			The type of the elements of the array.
+		fortran_order: bool, default False
+			If `True` the array is stored in column major order.
+		
+		Returns
+		-------
+		array: numpy.memmap
+			The file backed array.
+		"""
+		import numpy
+		shape = (shape,) if isinstance(shape, int) else tuple(shape)
+		path_to_array = self.path_to_directory_of_my_task/f'{name}.npy'
+		if path_to_array.exists():
+			raise RuntimeError(f'Array {repr(name)} already exists in task {repr(self.task_name)} of run {self.pseudopath}.')
+		array = numpy.lib.format.open_memmap(path_to_array, mode='w+', dtype=dtype, shape=shape, fortran_order=fortran_order)
+		with open(self.path_to_directory_of_my_task/f'{name}.json', 'w') as ofile:
+			json.dump(
+				{
+					'file_name': path_to_array.name,
+					'shape': list(shape),
+					'dtype': array.dtype.str,
+					'fortran_order': fortran_order,
+					'created': datetime.datetime.now().isoformat(),
+				},
+				ofile,
+				indent = 4,
+			)
+		if not hasattr(self, '_open_arrays'):
+			self._open_arrays = []
+		self._open_arrays.append(array)
+		return array
+	
+	def map_subruns(self, func, kwargs_by_subrun:dict, executor:str='process', max_workers:int=None, if_exists:str='raise error', success_policy='all')->dict:
+		"""Creates one subrun per item in `kwargs_by_subrun` and calls
+		`func(subrun_bureaucrat, **kwargs)` for each of them in parallel,
+		using a pool of processes or threads. An error in one of the
+		subruns does not stop the others. Usage example:
+		```
+		with a_run_bureaucrat.handle_task('sweep') as employee:
+			employee.map_subruns(
+				measure_something,
+				{f'point_{x}': dict(x=x) for x in [1,2,3]},
+			)
+		```
+		
+		Arguments
+		---------
+		func: callable
+			A function whose first argument is a `RunBureaucrat`. If
+			`executor='process'` it has to be picklable, i.e. defined at 
+			the top level of a module.
+		kwargs_by_subrun: dict
+			A dictionary of the form `{subrun_name: kwargs}` where `kwargs`
+			is a dictionary with the keyword arguments for `func`.
+		executor: str, default 'process'
+			Either `'process'` or `'thread'`.
+		max_workers: int, default None
+			Maximum number of workers, passed to the pool of the `executor`.
+		if_exists: str, default 'raise error'
+			What to do if a subrun already exists, see `create_subrun`.
+		success_policy: str or callable, default 'all'
+			Determines whether a `RuntimeError` is raised, once all the 
+			subruns have finished, which will make this task to be marked
+			as not successful (unless it is handled). Options are:
+			- `'all'`: Raise if any subrun failed.
+			- `'any'`: Raise only if all subruns failed.
+			- `'ignore'`: Never raise.
+			- A function receiving a dictionary `{subrun_name: successful}`
+			and returning `True` if the outcome is acceptable.
+		
+		Returns
+		-------
+		outcomes: dict
+			A dictionary of the form `{subrun_name: outcome}` where each
+			`outcome` is a dictionary with keys `'successful'`, `'result'`
+			(what `func` returned) and `'error'` (the traceback, if any).
+		"""
+		OPTIONS_FOR_EXECUTOR = {'process','thread'}
+		if executor not in OPTIONS_FOR_EXECUTOR:
+			raise ValueError(f'`executor` must be one of {OPTIONS_FOR_EXECUTOR}, received {repr(executor)}. ')
+		OPTIONS_FOR_SUCCESS_POLICY = {'all','any','ignore'}
+		if not callable(success_policy) and success_policy not in OPTIONS_FOR_SUCCESS_POLICY:
+			raise ValueError(f'`success_policy` must be one of {OPTIONS_FOR_SUCCESS_POLICY} or a function, received {repr(success_policy)}. ')
+		
+		subruns = {subrun_name: self.create_subrun(subrun_name, if_exists=if_exists) for subrun_name in kwargs_by_subrun}
+		
+		outcomes = {}
+		Executor = concurrent.futures.ProcessPoolExecutor if executor == 'process' else concurrent.futures.ThreadPoolExecutor
+		with Executor(max_workers=max_workers) as pool:
+			futures = {
+				pool.submit(_call_function_on_run, func, subrun.path_to_run_directory, kwargs_by_subrun[subrun_name] or {}): subrun_name 
+				for subrun_name,subrun in subruns.items()
+			}
+			for future in concurrent.futures.as_completed(futures):
+				try:
+					successful, result, error = future.result()
+				except Exception: # E.g. the worker process died, or the result could not be pickled.
+					successful, result, error = False, None, traceback.format_exc()
+				outcomes[futures[future]] = {'successful': successful, 'result': result, 'error': error}
+		outcomes = {subrun_name: outcomes[subrun_name] for subrun_name in kwargs_by_subrun}
+		
+		if not hasattr(self, '_subruns_outcomes'):
+			self._subruns_outcomes = {}
+		self._subruns_outcomes.update(outcomes)
+		
+		successes = {subrun_name: outcome['successful'] for subrun_name,outcome in outcomes.items()}
+		if callable(success_policy):
+			acceptable = success_policy(successes)
+		elif success_policy == 'all':
+			acceptable = all(successes.values())
+		elif success_policy == 'any':
+			acceptable = any(successes.values()) or len(successes) == 0
+		else:
+			acceptable = True
+		if not acceptable:
+			failed = [subrun_name for subrun_name,successful in successes.items() if not successful]
+			raise RuntimeError(f'Subrun(s) {failed} of task {repr(self.task_name)} in run {self.pseudopath} failed. First error was:\n{outcomes[failed[0]]["error"] if len(failed)>0 else None}')
+		return outcomes
+	
+	def clean_directory_of_my_task(self, in_background:bool=False):
+		"""Deletes all content in the default output directory.
+		
+		Arguments
+		---------
+		in_background: bool, default False
+			If `True`, the whole directory is moved into a trash directory
+			and an empty one is created in its place, then the old contents
+			are deleted in a background thread.
+		"""
+		if in_background == True:
+			trash.delete_in_background(self.path_to_directory_of_my_task)
+			self.path_to_directory_of_my_task.mkdir()
+			return
 		for p in self.path_to_directory_of_my_task.iterdir():
 			delete_directory_and_or_file_and_subtree(p)
+	
+	async def aclean_directory_of_my_task(self, in_background:bool=False):
+		"""Same as `clean_directory_of_my_task` but without blocking the event loop."""
+		await _offload(self.clean_directory_of_my_task, in_background=in_background)
+	
+	async def acreate_subrun(self, subrun_name:str, if_exists:str='raise error')->RunBureaucrat:
+		"""Same as `create_subrun` but without blocking the event loop."""
+		return await _offload(self.create_subrun, subrun_name, if_exists=if_exists)
+
+class SubrunLease(Lease):
+	def __init__(self, subrun:RunBureaucrat, path_to_lease:Path, path_to_done_marker:Path, ttl:float=DEFAULT_LEASE_TTL_SECONDS):
+		"""A `Lease` on a subrun, as returned by `TaskBureaucrat.claim_next_subrun`.
+		When used in a `with` statement, the subrun is marked as done
+		upon exit so no one claims it again."""
+		super().__init__(path_to_lease=path_to_lease, ttl=ttl)
+		self._subrun = subrun
+		self._path_to_done_marker = Path(path_to_done_marker)
+	
+	@property
+	def subrun(self)->RunBureaucrat:
+		"""Returns a `RunBureaucrat` pointing to the claimed subrun."""
+		return self._subrun
+	
+	@property
+	def path_to_done_marker(self)->Path:
+		return self._path_to_done_marker
+	
+	def mark_as_done(self, successful:bool=True):
+		"""Marks the subrun as done, so it will not be claimed again."""
+		path_to_temporary_file = self.path_to_done_marker.with_name(f'{self.path_to_done_marker.name}.{os.getpid()}.tmp')
+		with open(path_to_temporary_file, 'w') as ofile:
+			json.dump({'status': 'successful' if successful else 'failed', 'owner': self.owner, 'finished': time.time()}, ofile)
+		os.replace(path_to_temporary_file, self.path_to_done_marker)
+	
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		if self.is_held:
+			self.mark_as_done(successful=exc_type is None)
+		self.release()
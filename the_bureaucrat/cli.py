@@ -0,0 +1,132 @@
+"""Command line tool to inspect trees of runs without writing any Python,
+installed as `bureaucrat`. Usage examples:
+```
+bureaucrat status path/to/run
+bureaucrat ls path/to/run --max_depth 1
+bureaucrat failed path/to/run --json
+bureaucrat find path/to/run --task 'measure*' --status running
+bureaucrat du path/to/run --by subrun --top 10
+```
+Only the standard library and the bureaucrats are imported, and only
+when needed, so it starts fast."""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+TASK_STATUSES = ['successful','failed','running']
+
+def _human_readable_bytes(n_bytes:int)->str:
+	for unit in ['B','KiB','MiB','GiB','TiB']:
+		if n_bytes < 1024 or unit == 'TiB':
+			return f'{n_bytes:.0f} {unit}' if unit == 'B' else f'{n_bytes:.1f} {unit}'
+		n_bytes /= 1024
+
+def _walk_with_status(args)->list:
+	"""Returns a list of `(pseudopath, run, {task_name: status})` for all
+	the runs below `args.path`, sorted by pseudopath, where status is one
+	of `TASK_STATUSES`."""
+	from .bureaucrats import RunBureaucrat, path_to_report_of_task
+	bureaucrat = RunBureaucrat(Path(args.path).resolve())
+	if not bureaucrat.exists():
+		raise FileNotFoundError(f'{args.path} is not a run.')
+	runs = []
+	for pseudopath,run,tasks in bureaucrat.walk(max_depth=getattr(args, 'max_depth', None), max_workers=args.max_workers):
+		status_of_tasks = {}
+		for task_name,was_successful in sorted(tasks.items()):
+			if was_successful == True:
+				status_of_tasks[task_name] = 'successful'
+			else: # Either it failed or it has no report yet, only in this case it is worth to check.
+				status_of_tasks[task_name] = 'failed' if path_to_report_of_task(run.path_to_directory_of_task(task_name)) is not None else 'running'
+		runs.append((pseudopath, run, status_of_tasks))
+	return sorted(runs, key=lambda x: x[0].parts)
+
+def _print(args, for_humans:list, for_machines):
+	if args.json == True:
+		print(json.dumps(for_machines, indent=4, default=str))
+	else:
+		for line in for_humans:
+			print(line)
+
+def status(args):
+	runs = _walk_with_status(args)
+	count = {}
+	for _,_,tasks in runs:
+		for task_name,status in tasks.items():
+			count.setdefault(task_name, {status: 0 for status in TASK_STATUSES})[status] += 1
+	width = max([len(task_name) for task_name in count] + [4])
+	lines = [f'{len(runs)} runs'] + [f'{"task":<{width}}  ' + '  '.join(f'{status:>10}' for status in TASK_STATUSES)]
+	lines += [f'{task_name:<{width}}  ' + '  '.join(f'{count[task_name][status]:>10}' for status in TASK_STATUSES) for task_name in sorted(count)]
+	_print(args, lines, {'n_runs': len(runs), 'tasks': count})
+
+def ls(args):
+	runs = _walk_with_status(args)
+	depth = len(runs[0][0].parts) if len(runs) > 0 else 0
+	lines = []
+	for pseudopath,_,tasks in runs:
+		lines.append('  '*(len(pseudopath.parts)-depth) + pseudopath.name + ('  ' if len(tasks) > 0 else '') + '  '.join(f'{task_name} ({status})' for task_name,status in tasks.items()))
+	_print(args, lines, [{'pseudopath': pseudopath.as_posix(), 'path': str(run.path_to_run_directory), 'tasks': tasks} for pseudopath,run,tasks in runs])
+
+def find(args, status:str=None):
+	import fnmatch
+	status = status or args.status
+	found = []
+	for pseudopath,run,tasks in _walk_with_status(args):
+		if getattr(args, 'run', None) is not None and not fnmatch.fnmatch(run.run_name, args.run):
+			continue
+		for task_name,status_of_task in tasks.items():
+			if getattr(args, 'task', None) is not None and not fnmatch.fnmatch(task_name, args.task):
+				continue
+			if status is not None and status_of_task != status:
+				continue
+			found.append({'pseudopath': pseudopath.as_posix(), 'task_name': task_name, 'status': status_of_task, 'path': str(run.path_to_directory_of_task(task_name))})
+	_print(args, [f'{f["pseudopath"]}/{f["task_name"]} ({f["status"]})  {f["path"]}' for f in found], found)
+
+def failed(args):
+	find(args, status='failed')
+
+def du(args):
+	from .bureaucrats import RunBureaucrat
+	bureaucrat = RunBureaucrat(Path(args.path).resolve())
+	if not bureaucrat.exists():
+		raise FileNotFoundError(f'{args.path} is not a run.')
+	usage = bureaucrat.disk_usage(by=args.by, max_workers=args.max_workers)
+	usage = sorted(usage.items(), key=lambda x: x[1], reverse=True)[:args.top]
+	name = (lambda key: f'{key[0].as_posix()}/{key[1]}') if args.by == 'task' else (lambda key: key.as_posix())
+	_print(args, [f'{_human_readable_bytes(n_bytes):>12}  {name(key)}' for key,n_bytes in usage], [{'name': name(key), 'bytes': n_bytes} for key,n_bytes in usage])
+
+def main(argv:list=None)->int:
+	parser = argparse.ArgumentParser(prog='bureaucrat', description='Inspect trees of runs handled by `the_bureaucrat`.')
+	subparsers = parser.add_subparsers(dest='command', required=True)
+	for command,description in {
+		'status': 'Count the tasks in each status.',
+		'ls': 'Print the tree of runs with the status of their tasks.',
+		'failed': 'List the tasks that failed.',
+		'find': 'Find tasks by name, run name and status.',
+		'du': 'Show the disk usage.',
+	}.items():
+		subparser = subparsers.add_parser(command, help=description, description=description)
+		subparser.add_argument('path', nargs='?', default='.', help='Path to a run, by default the current directory.')
+		subparser.add_argument('--json', action='store_true', help='Print machine readable JSON.')
+		subparser.add_argument('--max_workers', type=int, default=16, help='Number of threads used to scan the tree.')
+		if command == 'ls':
+			subparser.add_argument('--max_depth', type=int, default=None)
+		if command == 'find':
+			subparser.add_argument('--task', default=None, help='Pattern for the name of the task, e.g. `measure*`.')
+			subparser.add_argument('--run', default=None, help='Pattern for the name of the run.')
+			subparser.add_argument('--status', choices=TASK_STATUSES, default=None)
+		if command == 'du':
+			subparser.add_argument('--by', choices=['task','subrun'], default='subrun')
+			subparser.add_argument('--top', type=int, default=20, help='Show only the N largest.')
+		subparser.set_defaults(func=globals()[command])
+	args = parser.parse_args(argv)
+	try:
+		args.func(args)
+	except FileNotFoundError as e:
+		print(f'bureaucrat {args.command}: {e}', file=sys.stderr)
+		return 2
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,79 @@
+from pathlib import Path
+import json
+import os
+
+DISK_USAGE_CACHE_FILE_NAME = '.bureaucrat_disk_usage.json'
+
+def bytes_used_by(stat_result:os.stat_result)->int:
+	"""Returns the space actually used in disk according to `stat_result`,
+	like `du` does, or the apparent size where that is not available."""
+	if hasattr(stat_result, 'st_blocks'):
+		return stat_result.st_blocks*512
+	return stat_result.st_size
+
+def bytes_in_directory(path:Path, skip:set=None)->int:
+	"""Returns the number of bytes used by everything within `path`,
+	recursively, without following symlinks.
+
+	Arguments
+	---------
+	path: Path
+		Path to the directory.
+	skip: set of str, default None
+		Names of files or directories directly within `path` that must
+		not be accounted.
+	"""
+	skip = skip or set()
+	n_bytes = 0
+	directories_to_scan = [(str(path), True)]
+	while len(directories_to_scan) > 0:
+		directory, is_top_level = directories_to_scan.pop()
+		try:
+			with os.scandir(directory) as entries:
+				for entry in entries:
+					if is_top_level and entry.name in skip:
+						continue
+					try:
+						n_bytes += bytes_used_by(entry.stat(follow_symlinks=False))
+						if entry.is_dir(follow_symlinks=False):
+							directories_to_scan.append((entry.path, False))
+					except FileNotFoundError:
+						pass
+		except (FileNotFoundError, NotADirectoryError):
+			pass
+	return n_bytes
+
+def bytes_in_directory_of_task(path_to_directory_of_task:Path, path_to_report:Path)->int:
+	"""Returns the number of bytes used by a task, not including its
+	subruns. If the task has finished, i.e. `path_to_report` is not `None`,
+	the result is cached within the directory of the task and reused
+	for as long as the report is not modified."""
+	path_to_directory_of_task = Path(path_to_directory_of_task)
+	path_to_cache = path_to_directory_of_task/DISK_USAGE_CACHE_FILE_NAME
+	report_modification_time = None if path_to_report is None else os.stat(path_to_report).st_mtime_ns
+	if report_modification_time is not None:
+		try:
+			with open(path_to_cache, 'r') as ifile:
+				cache = json.load(ifile)
+			if cache['report_modification_time'] == report_modification_time:
+				return cache['bytes']
+		except (FileNotFoundError, ValueError, KeyError):
+			pass
+	n_bytes = bytes_in_directory(path_to_directory_of_task, skip={'subruns', DISK_USAGE_CACHE_FILE_NAME})
+	if report_modification_time is not None:
+		path_to_temporary_file = path_to_cache.with_name(f'{path_to_cache.name}.{os.getpid()}.tmp')
+		try:
+			with open(path_to_temporary_file, 'w') as ofile:
+				json.dump({'report_modification_time': report_modification_time, 'bytes': n_bytes}, ofile)
+			os.replace(path_to_temporary_file, path_to_cache)
+		except OSError: # E.g. a read only file system, it is just a cache.
+			pass
+	return n_bytes
+
+def forget_cached_disk_usage(path_to_directory_of_task:Path):
+	"""Removes the cached disk usage of a task, e.g. after deleting some
+	of its files."""
+	try:
+		(Path(path_to_directory_of_task)/DISK_USAGE_CACHE_FILE_NAME).unlink()
+	except FileNotFoundError:
+		pass
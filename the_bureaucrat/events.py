@@ -0,0 +1,351 @@
+from pathlib import Path
+from collections import namedtuple, deque
+import threading
+import select
+import struct
+import queue
+import errno
+import time
+import sys
+import os
+
+EVENT_KINDS = {'run created','subrun created','task started','task successful','task failed'}
+
+BureaucratEvent = namedtuple('BureaucratEvent', ['kind','path_to_run','task_name','time'])
+BureaucratEvent.__doc__ = """An event happening within a tree of runs. `kind` is one of
+`EVENT_KINDS`, `path_to_run` is the absolute `Path` to the run where it
+happened, `task_name` is the name of the task (for `'subrun created'`
+it is the task the subrun belongs to, for `'run created'` it is `None`)
+and `time` is a Unix timestamp of when it was observed."""
+
+_KIND_BY_TASK_STATUS = {'running': 'task started', 'successful': 'task successful', 'failed': 'task failed'}
+_TASK_STATUS_BY_KIND = {kind: status for status,kind in _KIND_BY_TASK_STATUS.items()}
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_INOTIFY_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+_INOTIFY_EVENT_HEADER = struct.Struct('iIII')
+
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+
+def publish(kind:str, path_to_run:Path, task_name:str=None):
+	"""Delivers an event to all the watchers in this process that are
+	watching `path_to_run` or any of its ancestors. The bureaucrats call
+	this as they do their job, so watchers in the same process get the
+	events immediately instead of waiting for the file system. If nobody
+	is watching this does nothing."""
+	if len(_subscribers) == 0:
+		return
+	path_to_run = os.path.abspath(path_to_run)
+	event = BureaucratEvent(kind, Path(path_to_run), task_name, time.time())
+	with _subscribers_lock:
+		subscribers = list(_subscribers)
+	for watcher in subscribers:
+		if path_to_run == watcher._path_to_run or path_to_run.startswith(watcher._path_to_run + os.sep):
+			watcher._queue.put(event)
+
+class _Inotify:
+	"""Minimal wrapper of the Linux inotify API using `ctypes`."""
+	def __init__(self):
+		import ctypes.util # Imported here, instead of at the top, to keep the import of this module fast.
+		self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+		self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+		if self._fd < 0:
+			error = ctypes.get_errno()
+			raise OSError(error, os.strerror(error))
+		self._paths_by_watch = {}
+
+	def add_watch(self, path:str):
+		import ctypes
+		watch = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _INOTIFY_MASK)
+		if watch < 0:
+			error = ctypes.get_errno()
+			if error in {errno.ENOENT, errno.ENOTDIR}: # It is gone already, nothing to watch.
+				return
+			raise OSError(error, os.strerror(error), path)
+		self._paths_by_watch[watch] = path
+
+	def read(self, timeout:float)->set:
+		"""Waits up to `timeout` seconds for something to happen and returns
+		the set of directories where something happened, or `None` if
+		events were lost and everything has to be checked again."""
+		readable,_,_ = select.select([self._fd], [], [], timeout)
+		if len(readable) == 0:
+			return set()
+		try:
+			data = os.read(self._fd, 2**16)
+		except BlockingIOError:
+			return set()
+		changed_directories = set()
+		offset = 0
+		while offset < len(data):
+			watch, mask, _, length = _INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+			offset += _INOTIFY_EVENT_HEADER.size + length
+			if mask & _IN_Q_OVERFLOW:
+				return None
+			if mask & _IN_IGNORED:
+				self._paths_by_watch.pop(watch, None)
+			elif watch in self._paths_by_watch:
+				changed_directories.add(self._paths_by_watch[watch])
+		return changed_directories
+
+	def close(self):
+		os.close(self._fd)
+
+class _TreeScanner:
+	"""Keeps a snapshot of the directories of a tree of runs and, when
+	told that a directory changed, compares it with the snapshot and
+	reports what happened."""
+	def __init__(self, path_to_run:str, status_of_task, on_new_directory=None):
+		self._path_to_run = path_to_run
+		self._status_of_task = status_of_task
+		self._on_new_directory = on_new_directory
+		self._roles = {}
+		self._children = {}
+		self._modification_times = {}
+		self._known_runs = set()
+		self._status_of_tasks = {}
+
+	@property
+	def directories(self)->list:
+		return list(self._roles)
+
+	def start(self)->list:
+		return self._track(self._path_to_run, 'run')
+
+	def _track(self, path:str, role:str)->list:
+		self._roles[path] = role
+		self._children[path] = set()
+		self._children.setdefault(os.path.dirname(path), set()).add(path)
+		if self._on_new_directory is not None:
+			self._on_new_directory(path)
+		return self.refresh(path)
+
+	def _forget(self, path:str):
+		for child in self._children.pop(path, set()):
+			self._forget(child)
+		self._roles.pop(path, None)
+		self._modification_times.pop(path, None)
+		self._known_runs.discard(path)
+		self._status_of_tasks.pop(path, None)
+		if os.path.dirname(path) in self._children:
+			self._children[os.path.dirname(path)].discard(path)
+
+	def modified_directories(self)->list:
+		"""Returns the directories whose modification time changed since
+		they were last scanned, or that disappeared."""
+		modified_directories = []
+		for path,modification_time in list(self._modification_times.items()):
+			try:
+				if os.stat(path).st_mtime_ns != modification_time:
+					modified_directories.append(path)
+			except FileNotFoundError:
+				modified_directories.append(path)
+		return modified_directories
+
+	def refresh(self, path:str)->list:
+		"""Scans `path` again and returns a list of `BureaucratEvent`s with
+		whatever changed since last time."""
+		if path not in self._roles:
+			return []
+		now = time.time()
+		try:
+			self._modification_times[path] = os.stat(path).st_mtime_ns
+			with os.scandir(path) as entries:
+				entries = {entry.name: entry.is_dir() for entry in entries}
+		except (FileNotFoundError, NotADirectoryError):
+			self._forget(path)
+			return []
+		role = self._roles[path]
+		events = []
+		if role == 'run':
+			if 'bureaucrat_run_info.txt' in entries and path not in self._known_runs:
+				self._known_runs.add(path)
+				if path == self._path_to_run:
+					events.append(BureaucratEvent('run created', Path(path), None, now))
+				else:
+					events.append(BureaucratEvent('subrun created', Path(path), os.path.basename(os.path.dirname(os.path.dirname(path))), now))
+			children = {os.path.join(path, name) for name,is_dir in entries.items() if is_dir and not name.startswith('.bureaucrat')}
+			children_role = 'task'
+		elif role == 'task':
+			status = self._status_of_task(path, entries)
+			if status != self._status_of_tasks.get(path):
+				self._status_of_tasks[path] = status
+				events.append(BureaucratEvent(_KIND_BY_TASK_STATUS[status], Path(os.path.dirname(path)), os.path.basename(path), now))
+			children = {os.path.join(path, 'subruns')} if entries.get('subruns') == True else set()
+			children_role = 'subruns'
+		elif role == 'subruns':
+			children = {os.path.join(path, name) for name,is_dir in entries.items() if is_dir and not name.startswith('.bureaucrat')}
+			children_role = 'run'
+		for child in self._children[path] - children:
+			self._forget(child)
+		for child in sorted(children - self._children[path]):
+			events += self._track(child, children_role)
+		return events
+
+class RunWatcher:
+	def __init__(self, path_to_run:Path, status_of_task, include_existing:bool=False, backend:str='auto', poll_interval:float=1):
+		"""Create a `RunWatcher`, which reports what happens within a
+		run and all its subruns as a stream of `BureaucratEvent`s. Usually
+		you don't create this yourself but through `RunBureaucrat.watch`.
+
+		Arguments
+		---------
+		path_to_run: Path
+			Path to the directory of the run to watch.
+		status_of_task: callable
+			A function `status_of_task(path_to_directory_of_task, names_of_files)`
+			returning `'running'`, `'successful'` or `'failed'`.
+		include_existing: bool, default False
+			If `True`, the first events describe what already exists.
+			Otherwise only what happens from now on is reported.
+		backend: str, default 'auto'
+			How to notice changes done by other processes. Options are
+			`'inotify'` (only on Linux), `'poll'` or `'auto'`, which uses
+			inotify when available and falls back to polling otherwise.
+		poll_interval: float, default 1
+			Seconds between polls, only used when polling.
+		"""
+		OPTIONS_FOR_BACKEND = {'auto','inotify','poll'}
+		if backend not in OPTIONS_FOR_BACKEND:
+			raise ValueError(f'`backend` must be one of {OPTIONS_FOR_BACKEND}, received {repr(backend)}. ')
+		if backend == 'inotify' and not sys.platform.startswith('linux'):
+			raise ValueError(f'`backend` {repr(backend)} is only available on Linux, and this is {sys.platform}.')
+		self._path_to_run = os.path.abspath(path_to_run)
+		self._poll_interval = poll_interval
+		self._queue = queue.Queue()
+		self._pending = deque()
+		self._seen_runs = set()
+		self._last_status_of_tasks = {}
+		self._is_closed = False
+		self._stop = threading.Event()
+
+		self._inotify = None
+		if backend in {'auto','inotify'} and sys.platform.startswith('linux'):
+			try:
+				self._inotify = _Inotify()
+			except (OSError, AttributeError):
+				if backend == 'inotify':
+					raise
+		self._scanner = _TreeScanner(self._path_to_run, status_of_task, on_new_directory=self._add_watch)
+
+		with _subscribers_lock:
+			_subscribers.add(self)
+		for event in self._scanner.start(): # This is the snapshot of what already exists.
+			if self._is_new(event) and include_existing == True:
+				self._pending.append(event)
+		self._thread = threading.Thread(target=self._keep_watching, name='bureaucrat_watcher', daemon=True)
+		self._thread.start()
+
+	@property
+	def backend(self)->str:
+		"""Returns `'inotify'` or `'poll'`, whatever is currently used."""
+		return 'poll' if self._inotify is None else 'inotify'
+
+	@property
+	def is_closed(self)->bool:
+		return self._is_closed
+
+	def _add_watch(self, path:str):
+		if self._inotify is None:
+			return
+		try:
+			self._inotify.add_watch(path)
+		except OSError: # Most likely the limit of inotify watches was reached, so fall back to polling.
+			self._inotify.close()
+			self._inotify = None
+
+	def _keep_watching(self):
+		try:
+			while not self._stop.is_set():
+				if self._inotify is not None:
+					changed_directories = self._inotify.read(timeout=min(self._poll_interval, .5))
+					if changed_directories is None:
+						changed_directories = self._scanner.directories
+				else:
+					self._stop.wait(self._poll_interval)
+					changed_directories = self._scanner.modified_directories()
+				for path in changed_directories:
+					for event in self._scanner.refresh(path):
+						self._queue.put(event)
+		finally:
+			if self._inotify is not None:
+				self._inotify.close()
+
+	def _is_new(self, event:BureaucratEvent)->bool:
+		"""Events arrive both from this process and from the file system,
+		so each thing may be reported twice and not necessarily in order.
+		This keeps track of what was already reported and tells whether
+		`event` brings something new."""
+		if event.kind in {'run created','subrun created'}:
+			if event.path_to_run in self._seen_runs:
+				return False
+			self._seen_runs.add(event.path_to_run)
+			return True
+		status = _TASK_STATUS_BY_KIND[event.kind]
+		last_status, last_time = self._last_status_of_tasks.get((event.path_to_run, event.task_name), (None, None))
+		if last_status == status or (last_time is not None and event.time < last_time):
+			return False
+		self._last_status_of_tasks[(event.path_to_run, event.task_name)] = (status, event.time)
+		return True
+
+	def get(self, timeout:float=None)->BureaucratEvent:
+		"""Waits for the next event and returns it. If `timeout` seconds
+		elapse without events, or if the watcher is closed, returns `None`."""
+		if len(self._pending) > 0:
+			return self._pending.popleft()
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while not self.is_closed:
+			try:
+				event = self._queue.get(timeout=None if deadline is None else max(0, deadline-time.monotonic()))
+			except queue.Empty:
+				return None
+			if event is None: # Closed.
+				return None
+			if self._is_new(event):
+				return event
+		return None
+
+	def close(self):
+		"""Stops watching."""
+		if self.is_closed:
+			return
+		self._is_closed = True
+		with _subscribers_lock:
+			_subscribers.discard(self)
+		self._stop.set()
+		self._queue.put(None)
+		self._thread.join()
+
+	def __iter__(self):
+		while True:
+			event = self.get()
+			if event is None:
+				return
+			yield event
+
+	def __aiter__(self):
+		return self
+
+	async def __anext__(self)->BureaucratEvent:
+		import asyncio
+		loop = asyncio.get_running_loop()
+		while True:
+			event = await loop.run_in_executor(None, self.get, .5)
+			if event is not None:
+				return event
+			if self.is_closed:
+				raise StopAsyncIteration
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		self.close()
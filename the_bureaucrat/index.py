@@ -0,0 +1,301 @@
+from pathlib import Path, PurePosixPath
+from contextlib import closing
+import sqlite3
+import datetime
+import time
+
+INDEX_FILE_NAME = 'bureaucrat_index.sqlite'
+
+TASK_STATUSES = {'running','successful','failed'}
+
+class BureaucratIndex:
+	def __init__(self, path_to_root_run:Path):
+		"""Create a `BureaucratIndex`, a catalog of all the runs, tasks
+		and subruns that live below a root run. The catalog is stored
+		in an SQLite database within the root run directory, and it is
+		kept up to date by the bureaucrats as they do their job.
+
+		All the paths are stored relative to the root run, so the whole
+		tree can be moved around without invalidating the index.
+
+		Arguments
+		---------
+		path_to_root_run: Path
+			Path to the directory of the root run.
+		"""
+		self._path_to_root_run = Path(path_to_root_run)
+
+	@property
+	def path_to_root_run(self)->Path:
+		"""Returns a `Path` pointing to the root run of this index."""
+		return self._path_to_root_run
+
+	@property
+	def path_to_database(self)->Path:
+		"""Returns a `Path` pointing to the SQLite file of this index."""
+		return self.path_to_root_run/INDEX_FILE_NAME
+
+	def exists(self)->bool:
+		"""Returns `True` or `False` depending on whether the database
+		exists in the file system or not."""
+		return self.path_to_database.is_file()
+
+	def _connect(self):
+		return sqlite3.connect(self.path_to_database, timeout=60)
+
+	def _relative(self, path_to_run:Path)->str:
+		"""Converts an absolute path to a run into the key used in the
+		database."""
+		return PurePosixPath(Path(path_to_run).relative_to(self.path_to_root_run)).as_posix()
+
+	def _absolute(self, relative_path:str)->Path:
+		return self.path_to_root_run if relative_path == '.' else self.path_to_root_run/relative_path
+
+	def _pseudopath(self, relative_path:str)->Path:
+		if relative_path == '.':
+			return Path(self.path_to_root_run.name)
+		return Path(self.path_to_root_run.name, *PurePosixPath(relative_path).parts[2::3])
+
+	def create(self):
+		"""Creates the database and its tables, if they do not exist."""
+		with closing(self._connect()) as connection, connection:
+			connection.executescript(
+				"""
+				CREATE TABLE IF NOT EXISTS runs (
+					path TEXT PRIMARY KEY,
+					parent_path TEXT,
+					parent_task TEXT,
+					name TEXT NOT NULL,
+					pseudopath TEXT NOT NULL,
+					created REAL
+				);
+				CREATE INDEX IF NOT EXISTS runs_by_parent ON runs (parent_path, parent_task);
+				CREATE INDEX IF NOT EXISTS runs_by_created ON runs (created);
+				CREATE TABLE IF NOT EXISTS tasks (
+					run_path TEXT NOT NULL,
+					task_name TEXT NOT NULL,
+					status TEXT NOT NULL,
+					started REAL,
+					finished REAL,
+					PRIMARY KEY (run_path, task_name)
+				);
+				CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, task_name);
+				CREATE INDEX IF NOT EXISTS tasks_by_name ON tasks (task_name);
+				"""
+			)
+
+	def _run_row(self, path_to_run:Path, created:float)->tuple:
+		relative_path = self._relative(path_to_run)
+		if relative_path == '.':
+			return ('.', None, None, self.path_to_root_run.name, '', created)
+		parts = PurePosixPath(relative_path).parts
+		if len(parts)%3 != 0:
+			raise ValueError(f'{path_to_run} does not look like the path of a run within {self.path_to_root_run}.')
+		parent_path = PurePosixPath(*parts[:-3]).as_posix() if len(parts) > 3 else '.'
+		return (relative_path, parent_path, parts[-3], parts[-1], '/'.join(parts[2::3]), created)
+
+	def register_run(self, path_to_run:Path, created:float=None):
+		"""Adds a run to the index, or updates it if it was already there.
+
+		Arguments
+		---------
+		path_to_run: Path
+			Path to the directory of the run.
+		created: float, optional
+			Unix timestamp of the creation of the run. If not given, the
+			current time is used.
+		"""
+		self.register_runs([path_to_run], created=created)
+
+	def register_runs(self, paths_to_runs:list, created:float=None):
+		"""Same as `register_run` but for many runs in a single transaction."""
+		created = time.time() if created is None else created
+		rows = [self._run_row(p, created) for p in paths_to_runs]
+		with closing(self._connect()) as connection, connection:
+			connection.executemany('INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?)', rows)
+
+	def register_task_started(self, path_to_run:Path, task_name:str, when:float=None):
+		"""Marks a task as running in the index."""
+		when = time.time() if when is None else when
+		with closing(self._connect()) as connection, connection:
+			connection.execute(
+				'INSERT OR REPLACE INTO tasks VALUES (?,?,?,?,?)',
+				(self._relative(path_to_run), task_name, 'running', when, None),
+			)
+
+	def register_task_finished(self, path_to_run:Path, task_name:str, successful:bool, when:float=None):
+		"""Marks a task as finished in the index, either successfully
+		or not according to `successful`."""
+		when = time.time() if when is None else when
+		status = 'successful' if successful == True else 'failed'
+		relative_path = self._relative(path_to_run)
+		with closing(self._connect()) as connection, connection:
+			cursor = connection.execute(
+				'UPDATE tasks SET status = ?, finished = ? WHERE run_path = ? AND task_name = ?',
+				(status, when, relative_path, task_name),
+			)
+			if cursor.rowcount == 0:
+				connection.execute(
+					'INSERT INTO tasks VALUES (?,?,?,?,?)',
+					(relative_path, task_name, status, None, when),
+				)
+
+	def _forget_runs_below(self, connection, prefix:str):
+		"""Deletes all the runs (and their tasks) whose relative path
+		starts with `prefix`, which must end with '/'."""
+		upper_bound = prefix[:-1] + chr(ord('/')+1)
+		connection.execute('DELETE FROM runs WHERE path >= ? AND path < ?', (prefix, upper_bound))
+		connection.execute('DELETE FROM tasks WHERE run_path >= ? AND run_path < ?', (prefix, upper_bound))
+
+	def forget_run(self, path_to_run:Path):
+		"""Removes a run, its tasks and all its subruns from the index."""
+		relative_path = self._relative(path_to_run)
+		with closing(self._connect()) as connection, connection:
+			if relative_path == '.':
+				connection.execute('DELETE FROM runs')
+				connection.execute('DELETE FROM tasks')
+				return
+			connection.execute('DELETE FROM runs WHERE path = ?', (relative_path,))
+			connection.execute('DELETE FROM tasks WHERE run_path = ?', (relative_path,))
+			self._forget_runs_below(connection, relative_path + '/')
+
+	def forget_subruns_of_task(self, path_to_run:Path, task_name:str):
+		"""Removes all the subruns of a task from the index."""
+		relative_path = self._relative(path_to_run)
+		prefix = f'{task_name}/' if relative_path == '.' else f'{relative_path}/{task_name}/'
+		with closing(self._connect()) as connection, connection:
+			self._forget_runs_below(connection, prefix)
+
+	def forget_task(self, path_to_run:Path, task_name:str):
+		"""Removes a task and all its subruns from the index."""
+		relative_path = self._relative(path_to_run)
+		prefix = f'{task_name}/' if relative_path == '.' else f'{relative_path}/{task_name}/'
+		with closing(self._connect()) as connection, connection:
+			connection.execute('DELETE FROM tasks WHERE run_path = ? AND task_name = ?', (relative_path, task_name))
+			self._forget_runs_below(connection, prefix)
+
+	def replace_all(self, runs:list, tasks:list):
+		"""Replaces the whole content of the index in a single transaction.
+
+		Arguments
+		---------
+		runs: list of tuple
+			A list of `(path_to_run, created)` tuples.
+		tasks: list of tuple
+			A list of `(path_to_run, task_name, status, started, finished)`
+			tuples.
+		"""
+		with closing(self._connect()) as connection, connection:
+			connection.execute('DELETE FROM runs')
+			connection.execute('DELETE FROM tasks')
+			connection.executemany(
+				'INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?)',
+				[self._run_row(p, created) for p,created in runs],
+			)
+			connection.executemany(
+				'INSERT OR REPLACE INTO tasks VALUES (?,?,?,?,?)',
+				[(self._relative(p), task_name, status, started, finished) for p,task_name,status,started,finished in tasks],
+			)
+
+	def list_subruns_of_task(self, path_to_run:Path, task_name:str)->list:
+		"""Returns a list of `Path`s pointing to the subruns of a task."""
+		with closing(self._connect()) as connection:
+			rows = connection.execute(
+				'SELECT path FROM runs WHERE parent_path = ? AND parent_task = ? ORDER BY name',
+				(self._relative(path_to_run), task_name),
+			).fetchall()
+		return [self._absolute(path) for path, in rows]
+
+	def pseudopath(self, path_to_run:Path)->Path:
+		"""Returns the pseudopath of a run, or `None` if the run is not
+		in the index."""
+		with closing(self._connect()) as connection:
+			row = connection.execute('SELECT path FROM runs WHERE path = ?', (self._relative(path_to_run),)).fetchone()
+		return None if row is None else self._pseudopath(row[0])
+
+	def when_was_run_created(self, path_to_run:Path)->datetime.datetime:
+		"""Returns the creation time of a run, or `None` if the run is
+		not in the index."""
+		with closing(self._connect()) as connection:
+			row = connection.execute('SELECT created FROM runs WHERE path = ?', (self._relative(path_to_run),)).fetchone()
+		return None if row is None or row[0] is None else datetime.datetime.fromtimestamp(row[0])
+
+	def runs(self, under:Path=None, created_after:datetime.datetime=None, created_before:datetime.datetime=None)->list:
+		"""Returns a list of `(path_to_run, pseudopath, created)` tuples
+		for the runs in the index.
+
+		Arguments
+		---------
+		under: Path, optional
+			If given, only runs below this run (and the run itself) are
+			returned.
+		created_after, created_before: datetime, optional
+			If given, only runs created within this time window are returned.
+		"""
+		query = 'SELECT path, created FROM runs WHERE 1'
+		parameters = []
+		if under is not None:
+			relative_path = self._relative(under)
+			if relative_path != '.':
+				query += ' AND (path = ? OR (path >= ? AND path < ?))'
+				parameters += [relative_path, relative_path + '/', relative_path + chr(ord('/')+1)]
+		if created_after is not None:
+			query += ' AND created >= ?'
+			parameters.append(created_after.timestamp())
+		if created_before is not None:
+			query += ' AND created < ?'
+			parameters.append(created_before.timestamp())
+		with closing(self._connect()) as connection:
+			rows = connection.execute(query + ' ORDER BY path', parameters).fetchall()
+		return [
+			(self._absolute(path), self._pseudopath(path), None if created is None else datetime.datetime.fromtimestamp(created))
+			for path,created in rows
+		]
+
+	def tasks(self, under:Path=None, task_name:str=None, status:str=None, finished_after:datetime.datetime=None, finished_before:datetime.datetime=None)->list:
+		"""Returns a list of `(path_to_run, pseudopath, task_name, status, started, finished)`
+		tuples for the tasks in the index. Times are `datetime` objects
+		or `None` when unknown.
+
+		Arguments
+		---------
+		under: Path, optional
+			If given, only tasks belonging to this run or any of its
+			subruns (recursively) are returned.
+		task_name: str, optional
+			If given, only tasks with this name are returned.
+		status: str, optional
+			If given, only tasks with this status are returned. Options
+			are `'running'`, `'successful'` and `'failed'`.
+		finished_after, finished_before: datetime, optional
+			If given, only tasks that finished within this time window
+			are returned.
+		"""
+		if status is not None and status not in TASK_STATUSES:
+			raise ValueError(f'`status` must be one of {TASK_STATUSES}, received {repr(status)}. ')
+		query = 'SELECT run_path, task_name, status, started, finished FROM tasks WHERE 1'
+		parameters = []
+		if under is not None:
+			relative_path = self._relative(under)
+			if relative_path != '.':
+				query += ' AND (run_path = ? OR (run_path >= ? AND run_path < ?))'
+				parameters += [relative_path, relative_path + '/', relative_path + chr(ord('/')+1)]
+		if task_name is not None:
+			query += ' AND task_name = ?'
+			parameters.append(task_name)
+		if status is not None:
+			query += ' AND status = ?'
+			parameters.append(status)
+		if finished_after is not None:
+			query += ' AND finished >= ?'
+			parameters.append(finished_after.timestamp())
+		if finished_before is not None:
+			query += ' AND finished < ?'
+			parameters.append(finished_before.timestamp())
+		with closing(self._connect()) as connection:
+			rows = connection.execute(query + ' ORDER BY run_path, task_name', parameters).fetchall()
+		to_datetime = lambda t: None if t is None else datetime.datetime.fromtimestamp(t)
+		return [
+			(self._absolute(run_path), self._pseudopath(run_path), task_name, status, to_datetime(started), to_datetime(finished))
+			for run_path,task_name,status,started,finished in rows
+		]
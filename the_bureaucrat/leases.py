@@ -0,0 +1,145 @@
+from pathlib import Path
+import threading
+import socket
+import json
+import uuid
+import time
+import os
+
+LEASES_DIRECTORY_NAME = '.bureaucrat_leases'
+
+DEFAULT_LEASE_TTL_SECONDS = 60
+
+class Lease:
+	def __init__(self, path_to_lease:Path, ttl:float=DEFAULT_LEASE_TTL_SECONDS):
+		"""Create a `Lease`, an exclusive claim on something that is shared
+		between many processes, possibly in different computers sharing
+		the file system. The lease is a file created atomically, so only
+		one process can hold it. While held, a background thread keeps
+		touching it (the heartbeat); if the holder dies and the heartbeat
+		stops for longer than `ttl` the lease is considered stale and
+		someone else can take it over.
+
+		Arguments
+		---------
+		path_to_lease: Path
+			Path to the lease file.
+		ttl: float, default 60
+			Seconds without heartbeat after which the lease is stale.
+		"""
+		if ttl <= 0:
+			raise ValueError(f'`ttl` must be a positive number of seconds, received {repr(ttl)}.')
+		self._path_to_lease = Path(path_to_lease)
+		self._ttl = ttl
+		self._owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}'
+		self._is_held = False
+		self._was_lost = False
+		self._stop_heartbeat = threading.Event()
+		self._heartbeat_thread = None
+
+	@property
+	def path_to_lease(self)->Path:
+		return self._path_to_lease
+
+	@property
+	def owner(self)->str:
+		"""Returns a string identifying this lease, of the form `host:pid:uuid`."""
+		return self._owner
+
+	@property
+	def is_held(self)->bool:
+		"""Returns `True` while the lease is held by this instance."""
+		return self._is_held and not self._was_lost
+
+	@property
+	def was_lost(self)->bool:
+		"""Returns `True` if someone else took over the lease while it
+		was held by this instance, e.g. because the heartbeat could not
+		run for longer than `ttl`."""
+		return self._was_lost
+
+	def current_owner(self)->str:
+		"""Returns the owner of the lease file as it is now in the file
+		system, or `None` if nobody holds it."""
+		try:
+			with open(self.path_to_lease, 'r') as ifile:
+				return json.load(ifile)['owner']
+		except (FileNotFoundError, ValueError, KeyError):
+			return None
+
+	def acquire(self)->bool:
+		"""Tries to acquire the lease, without waiting. Returns `True` if
+		it was acquired, `False` if someone else holds it."""
+		if self._is_held:
+			raise RuntimeError(f'The lease {self.path_to_lease} is already held by this instance.')
+		self.path_to_lease.parent.mkdir(parents=True, exist_ok=True)
+		for _ in range(2):
+			try:
+				fd = os.open(self.path_to_lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+			except FileExistsError:
+				if not self._take_over_if_stale():
+					return False
+				continue
+			with os.fdopen(fd, 'w') as ofile:
+				json.dump({'owner': self.owner, 'host': socket.gethostname(), 'pid': os.getpid(), 'acquired': time.time()}, ofile)
+			self._is_held = True
+			self._heartbeat_thread = threading.Thread(target=self._keep_beating, name='bureaucrat_lease_heartbeat', daemon=True)
+			self._heartbeat_thread.start()
+			return True
+		return False
+
+	def _take_over_if_stale(self)->bool:
+		"""If the lease file is stale removes it and returns `True`,
+		otherwise returns `False`."""
+		try:
+			if time.time() - os.stat(self.path_to_lease).st_mtime < self._ttl:
+				return False
+		except FileNotFoundError:
+			return True
+		# Many may be trying to take over at the same time, so first move it away atomically, only one will succeed.
+		path_to_stale_lease = self.path_to_lease.with_name(f'{self.path_to_lease.name}.stale.{uuid.uuid4().hex}')
+		try:
+			os.rename(self.path_to_lease, path_to_stale_lease)
+		except FileNotFoundError:
+			return True
+		if time.time() - os.stat(path_to_stale_lease).st_mtime < self._ttl: # Someone else took it over right before, and we moved away their fresh lease, so put it back.
+			try:
+				os.link(path_to_stale_lease, self.path_to_lease)
+			except FileExistsError:
+				pass
+			os.unlink(path_to_stale_lease)
+			return False
+		os.unlink(path_to_stale_lease)
+		return True
+
+	def _keep_beating(self):
+		while not self._stop_heartbeat.wait(self._ttl/4):
+			if self.current_owner() != self.owner:
+				self._was_lost = True
+				return
+			try:
+				os.utime(self.path_to_lease)
+			except FileNotFoundError:
+				self._was_lost = True
+				return
+
+	def release(self):
+		"""Releases the lease, if held."""
+		if not self._is_held:
+			return
+		self._stop_heartbeat.set()
+		self._heartbeat_thread.join()
+		if not self._was_lost and self.current_owner() == self.owner:
+			try:
+				os.unlink(self.path_to_lease)
+			except FileNotFoundError:
+				pass
+		self._is_held = False
+
+	def __enter__(self):
+		if not self._is_held and not self.acquire():
+			raise RuntimeError(f'Cannot acquire lease {self.path_to_lease}, it is held by {self.current_owner()}.')
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		self.release()
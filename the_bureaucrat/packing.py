@@ -0,0 +1,125 @@
+from pathlib import Path, PurePosixPath
+import threading
+import zipfile
+import shutil
+import os
+from .trash import make_writable_and_retry
+
+PACK_FILE_NAME = 'bureaucrat_packed_run.zip'
+
+FILES_KEPT_OUTSIDE_THE_PACK = {'bureaucrat_run_info.txt'}
+
+_open_packs = {}
+_open_packs_lock = threading.Lock()
+
+class PackedRun:
+	def __init__(self, path_to_run:Path):
+		"""Read only access to the contents of a run that was packed into
+		a single archive with `pack_run`. Usually you don't need to create
+		this, the bureaucrats use it behind the scenes.
+
+		Arguments
+		---------
+		path_to_run: Path
+			Path to the directory of the run that was packed.
+		"""
+		self._path_to_run = Path(path_to_run)
+		self._zip_file = zipfile.ZipFile(self._path_to_run/PACK_FILE_NAME, 'r')
+		self._root = zipfile.Path(self._zip_file)
+
+	@property
+	def path_to_run(self)->Path:
+		return self._path_to_run
+
+	def path(self, relative_path:str=''):
+		"""Returns a `zipfile.Path` pointing to `relative_path` within the
+		pack. It can be used like a `Path` for reading, e.g. with `open`,
+		`read_text`, `iterdir`, `exists`, etc."""
+		relative_path = PurePosixPath(relative_path).as_posix()
+		if relative_path in {'', '.'}:
+			return self._root
+		return self._root/relative_path
+
+def open_pack(path_to_run:Path)->PackedRun:
+	"""Returns a `PackedRun` for the run in `path_to_run`, reusing the
+	one already open if the pack did not change since then."""
+	path_to_run = Path(path_to_run)
+	modification_time = os.stat(path_to_run/PACK_FILE_NAME).st_mtime_ns
+	with _open_packs_lock:
+		if path_to_run not in _open_packs or _open_packs[path_to_run][0] != modification_time:
+			_open_packs[path_to_run] = (modification_time, PackedRun(path_to_run))
+		return _open_packs[path_to_run][1]
+
+def find_pack_containing(path:Path)->tuple:
+	"""If `path` lies within a packed run, returns a tuple `(packed_run, relative_path)`
+	where `relative_path` is the location of `path` within the pack,
+	otherwise returns `None`."""
+	ancestor = os.path.normpath(path)
+	levels = 0
+	while True:
+		if os.path.isfile(os.path.join(ancestor, PACK_FILE_NAME)):
+			parts = Path(path).parts
+			relative_path = PurePosixPath(*parts[len(parts)-levels:]).as_posix() if levels > 0 else ''
+			return open_pack(Path(ancestor)), relative_path
+		if os.path.isdir(ancestor): # The first existing directory going up is where the pack would be.
+			return None
+		parent = os.path.dirname(ancestor)
+		if parent in {'', ancestor}:
+			return None
+		ancestor = parent
+		levels += 1
+
+def pack_run(path_to_run:Path, compress:bool=False, skip:set=None)->Path:
+	"""Packs everything inside `path_to_run` into a single zip archive
+	at `path_to_run/PACK_FILE_NAME`, and deletes the packed files and
+	directories. The run info files are kept outside too, so the run
+	still looks like a run.
+
+	Arguments
+	---------
+	path_to_run: Path
+		Path to the directory of the run.
+	compress: bool, default False
+		If `True` the files are compressed, otherwise they are just stored,
+		which is faster to read.
+	skip: set of str, default None
+		Names of files or directories, directly within `path_to_run`,
+		that must not be packed and are left untouched.
+
+	Returns
+	-------
+	path_to_pack: Path
+		Path to the archive.
+	"""
+	path_to_run = Path(path_to_run)
+	skip = set(skip or set()) | {PACK_FILE_NAME, f'{PACK_FILE_NAME}.tmp'}
+	path_to_temporary_file = path_to_run/f'{PACK_FILE_NAME}.tmp'
+	with zipfile.ZipFile(path_to_temporary_file, 'w', compression=zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED) as zip_file:
+		for directory, directories_names, files_names in os.walk(path_to_run):
+			directory = Path(directory)
+			if directory == path_to_run:
+				directories_names[:] = [name for name in directories_names if name not in skip]
+				files_names = [name for name in files_names if name not in skip]
+			for name in directories_names:
+				zip_file.write(directory/name, arcname=(directory/name).relative_to(path_to_run).as_posix())
+			for name in files_names:
+				zip_file.write(directory/name, arcname=(directory/name).relative_to(path_to_run).as_posix())
+	os.replace(path_to_temporary_file, path_to_run/PACK_FILE_NAME)
+	for p in path_to_run.iterdir():
+		if p.name in skip or p.name in FILES_KEPT_OUTSIDE_THE_PACK:
+			continue
+		if p.is_dir() and not p.is_symlink():
+			shutil.rmtree(p, onerror=make_writable_and_retry)
+		else:
+			p.unlink()
+	return path_to_run/PACK_FILE_NAME
+
+def unpack_run(path_to_run:Path):
+	"""Restores the directories and files of a run packed with `pack_run`
+	and deletes the archive."""
+	path_to_run = Path(path_to_run)
+	with zipfile.ZipFile(path_to_run/PACK_FILE_NAME, 'r') as zip_file:
+		zip_file.extractall(path_to_run)
+	with _open_packs_lock:
+		_open_packs.pop(path_to_run, None)
+	(path_to_run/PACK_FILE_NAME).unlink()
@@ -0,0 +1,217 @@
+from .bureaucrats import RunBureaucrat, TaskBureaucrat
+from pathlib import Path
+import concurrent.futures
+import traceback
+
+def _run_scheduled_task(func, path_to_the_run:Path, task_name:str, path_to_script_to_backup:Path)->tuple:
+	"""Handles the task `task_name` in the run at `path_to_the_run` and
+	calls `func` with the `TaskBureaucrat`, catching any error. Meant to
+	be executed in a worker of `TaskScheduler.run`."""
+	try:
+		with TaskBureaucrat(path_to_the_run=path_to_the_run, task_name=task_name, path_to_script_to_backup=path_to_script_to_backup) as employee:
+			func(employee)
+		return True, None
+	except Exception:
+		return False, traceback.format_exc()
+
+class TaskScheduler:
+	def __init__(self):
+		"""Create a `TaskScheduler`, which knows how to do a set of tasks
+		and what each of them needs, and runs them across a tree of runs
+		in the right order, doing in parallel whatever does not depend
+		on each other. Usage example:
+		```
+		scheduler = TaskScheduler()
+
+		@scheduler.task(subruns_depend_on={'sweep': ['measure']})
+		def plot_sweep(employee:TaskBureaucrat):
+			for subrun in employee.list_subruns_of_task('sweep'):
+				...
+
+		@scheduler.task(depends_on=['plot_sweep'])
+		def summary(employee:TaskBureaucrat):
+			...
+
+		scheduler.run(a_run_bureaucrat, ['summary'])
+		```
+		Each task function receives the `TaskBureaucrat` handling the
+		task, so it must not call `handle_task` for it.
+		"""
+		self._tasks = {}
+
+	@property
+	def tasks_names(self)->list:
+		"""Returns a list with the names of the registered tasks."""
+		return list(self._tasks)
+
+	def register(self, func, task_name:str=None, depends_on:list=None, subruns_depend_on:dict=None):
+		"""Registers a task function.
+
+		Arguments
+		---------
+		func: callable
+			The function that does the task, `func(employee)` where `employee`
+			is the `TaskBureaucrat` handling the task. If the tasks will be
+			run in a pool of processes it has to be picklable, i.e. defined
+			at the top level of a module.
+		task_name: str, default None
+			The name of the task. If `None`, the name of `func` is used.
+		depends_on: list of str, default None
+			Names of tasks in the same run that have to be completed
+			successfully before this one.
+		subruns_depend_on: dict, default None
+			A dictionary of the form `{task_name: [subtasks_names]}` meaning
+			that, before this task, `task_name` has to be completed successfully
+			in the same run and then each of `subtasks_names` has to be
+			completed successfully in each of its subruns.
+		"""
+		task_name = func.__name__ if task_name is None else task_name
+		if isinstance(depends_on, str):
+			depends_on = [depends_on]
+		subruns_depend_on = {task: [subtasks] if isinstance(subtasks, str) else list(subtasks) for task,subtasks in (subruns_depend_on or {}).items()}
+		self._tasks[task_name] = {
+			'func': func,
+			'depends_on': list(depends_on or []),
+			'subruns_depend_on': subruns_depend_on,
+		}
+		self._check_there_are_no_cycles()
+
+	def task(self, task_name:str=None, depends_on:list=None, subruns_depend_on:dict=None):
+		"""Decorator to register a task function, see `register`."""
+		def decorator(func):
+			self.register(func, task_name=task_name, depends_on=depends_on, subruns_depend_on=subruns_depend_on)
+			return func
+		return decorator
+
+	def _check_there_are_no_cycles(self):
+		"""Raises `ValueError` if some task depends on itself through other
+		tasks in the same run."""
+		def dependencies_in_same_run(task_name:str)->list:
+			if task_name not in self._tasks:
+				return []
+			return self._tasks[task_name]['depends_on'] + list(self._tasks[task_name]['subruns_depend_on'])
+		for task_name in self._tasks:
+			to_visit = [(task_name, [task_name])]
+			while len(to_visit) > 0:
+				current, chain = to_visit.pop()
+				for dependency in dependencies_in_same_run(current):
+					if dependency == task_name:
+						raise ValueError(f'Tasks have circular dependencies: {" -> ".join(chain + [dependency])}.')
+					if dependency not in chain:
+						to_visit.append((dependency, chain + [dependency]))
+
+	def run(self, bureaucrat:RunBureaucrat, tasks_names:list=None, executor:str='thread', max_workers:int=None, rerun:bool=False)->dict:
+		"""Runs tasks in `bureaucrat`, together with everything they depend
+		on, in this run and in its subruns. Tasks that do not depend on
+		each other are run in parallel. Tasks that were already completed
+		successfully are not run again. If a task fails, only the tasks
+		that depend on it are not run, the others go on.
+
+		Arguments
+		---------
+		bureaucrat: RunBureaucrat
+			The run where to do the tasks.
+		tasks_names: list of str, default None
+			The tasks to do. If `None`, all the registered tasks are done.
+		executor: str, default 'thread'
+			Either `'thread'` or `'process'`.
+		max_workers: int, default None
+			Maximum number of workers, passed to the pool of the `executor`.
+		rerun: bool, default False
+			If `True`, registered tasks are run even if they were already
+			completed successfully.
+
+		Returns
+		-------
+		outcomes: dict
+			A dictionary of the form `{(path_to_run, task_name): outcome}`
+			for every task that was considered, where each `outcome` is
+			a dictionary with keys `'status'`, one of `'successful'`, `'skipped'`
+			(was already done), `'failed'` or `'blocked'` (something it
+			depends on failed), and `'error'`.
+		"""
+		OPTIONS_FOR_EXECUTOR = {'process','thread'}
+		if executor not in OPTIONS_FOR_EXECUTOR:
+			raise ValueError(f'`executor` must be one of {OPTIONS_FOR_EXECUTOR}, received {repr(executor)}. ')
+		tasks_names = self.tasks_names if tasks_names is None else [tasks_names] if isinstance(tasks_names, str) else list(tasks_names)
+		if not bureaucrat.exists():
+			raise RuntimeError(f'Cannot run tasks in run {repr(bureaucrat.run_name)} in {bureaucrat.path_to_run_directory} because it does not exist.')
+
+		nodes = {}
+		outcomes = {}
+		futures = {}
+		running = set()
+		Executor = concurrent.futures.ProcessPoolExecutor if executor == 'process' else concurrent.futures.ThreadPoolExecutor
+		pool = Executor(max_workers=max_workers)
+
+		def finish(key:tuple, status:str, error:str=None):
+			outcomes[key] = {'status': status, 'error': error}
+			for dependent in nodes[key]['dependents']:
+				if dependent in outcomes:
+					continue
+				if status in {'failed','blocked'}:
+					finish(dependent, 'blocked', f'Task {repr(key[1])} in {key[0]} did not complete successfully.')
+				else:
+					nodes[dependent]['waiting_for'].discard(key)
+					start_if_ready(dependent)
+
+		def link(key:tuple, dependency:tuple):
+			add(dependency)
+			if key in outcomes:
+				return
+			if dependency not in outcomes:
+				nodes[key]['waiting_for'].add(dependency)
+				nodes[dependency]['dependents'].add(key)
+			elif outcomes[dependency]['status'] in {'failed','blocked'}:
+				finish(key, 'blocked', f'Task {repr(dependency[1])} in {dependency[0]} did not complete successfully.')
+
+		def add(key:tuple):
+			if key in nodes:
+				return
+			path_to_run, task_name = key
+			nodes[key] = {'waiting_for': set(), 'dependents': set(), 'subruns_were_added': False}
+			if task_name not in self._tasks:
+				if RunBureaucrat(path_to_run).was_task_run_successfully(task_name):
+					finish(key, 'skipped')
+				else:
+					finish(key, 'failed', f'Task {repr(task_name)} is not registered in the scheduler and was not run successfully in {path_to_run}.')
+				return
+			if rerun == False and RunBureaucrat(path_to_run).was_task_run_successfully(task_name):
+				finish(key, 'skipped')
+				return
+			for dependency in self._tasks[task_name]['depends_on'] + list(self._tasks[task_name]['subruns_depend_on']):
+				link(key, (path_to_run, dependency))
+			start_if_ready(key)
+
+		def start_if_ready(key:tuple):
+			if key in outcomes or key in running or len(nodes[key]['waiting_for']) > 0:
+				return
+			path_to_run, task_name = key
+			task = self._tasks[task_name]
+			if not nodes[key]['subruns_were_added']: # Now the tasks with the subruns are done, so we know which subruns there are.
+				nodes[key]['subruns_were_added'] = True
+				for parent_task_name,subtasks_names in task['subruns_depend_on'].items():
+					for subrun in RunBureaucrat(path_to_run).list_subruns_of_task(parent_task_name):
+						for subtask_name in subtasks_names:
+							link(key, (subrun.path_to_run_directory, subtask_name))
+				if key in outcomes or len(nodes[key]['waiting_for']) > 0:
+					return
+			futures[pool.submit(_run_scheduled_task, task['func'], path_to_run, task_name, Path(task['func'].__code__.co_filename))] = key
+			running.add(key)
+
+		try:
+			for task_name in tasks_names:
+				add((bureaucrat.path_to_run_directory, task_name))
+			while len(futures) > 0:
+				done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					key = futures.pop(future)
+					running.discard(key)
+					try:
+						was_successful, error = future.result()
+					except Exception: # E.g. the worker process died, or the function could not be pickled.
+						was_successful, error = False, traceback.format_exc()
+					finish(key, 'successful' if was_successful else 'failed', error)
+		finally:
+			pool.shutdown(wait=True)
+		return outcomes
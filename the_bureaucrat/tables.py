@@ -0,0 +1,204 @@
+from pathlib import Path
+import json
+import os
+
+MANIFEST_FILE_NAME = 'manifest.json'
+
+def _write_json_atomically(obj, path:Path):
+	path_to_temporary_file = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+	with open(path_to_temporary_file, 'w') as ofile:
+		json.dump(obj, ofile, indent=4)
+	os.replace(path_to_temporary_file, path)
+
+class TableWriter:
+	def __init__(self, path_to_table:Path, schema:dict, chunk_size:int=2**16):
+		"""Create a `TableWriter`, which appends rows into a table stored
+		as a directory with a sequence of `.npy` chunks and a manifest.
+		Rows are buffered in memory and each time `chunk_size` rows are
+		accumulated they are written into a new chunk, so the memory
+		used is bounded and, if anything goes wrong, everything up to
+		the last chunk is safe on disk and can be read with `TableReader`.
+		Usually you don't create this yourself but through `TaskBureaucrat.open_table`.
+
+		Arguments
+		---------
+		path_to_table: Path
+			Path to the directory where to store the table. It must not
+			exist.
+		schema: dict
+			A dictionary of the form `{column_name: dtype}`, e.g.
+			`{'n_measurement': 'int64', 'voltage': 'float64'}`. Any numpy
+			dtype is accepted, except for `object`.
+		chunk_size: int, default 65536
+			Number of rows in each chunk.
+		"""
+		import numpy
+		self._path_to_table = Path(path_to_table)
+		self._dtype = numpy.dtype([(str(column), numpy.dtype(dtype)) for column,dtype in schema.items()])
+		if self._dtype.hasobject:
+			raise ValueError(f'`schema` cannot contain columns of type `object`, received {schema}.')
+		if not isinstance(chunk_size, int) or chunk_size <= 0:
+			raise ValueError(f'`chunk_size` must be a positive integer, received {repr(chunk_size)}.')
+		self._buffer = numpy.empty(chunk_size, dtype=self._dtype)
+		self._n_rows_in_buffer = 0
+		self._path_to_table.mkdir()
+		self._manifest = {
+			'schema': [[column, self._dtype[column].str] for column in self._dtype.names],
+			'chunks': [],
+			'n_rows': 0,
+			'finalized': False,
+		}
+		_write_json_atomically(self._manifest, self._path_to_table/MANIFEST_FILE_NAME)
+
+	@property
+	def path_to_table(self)->Path:
+		"""Returns a `Path` pointing to the directory of the table."""
+		return self._path_to_table
+
+	@property
+	def n_rows(self)->int:
+		"""Returns the number of rows appended so far, including those
+		still in the buffer."""
+		return self._manifest['n_rows'] + self._n_rows_in_buffer
+
+	@property
+	def is_closed(self)->bool:
+		return self._manifest['finalized']
+
+	def append(self, row:dict=None, **columns):
+		"""Appends one row to the table. Usage example:
+		```
+		table.append(n_measurement=1, voltage=3.3)
+		table.append({'n_measurement': 2, 'voltage': 3.4})
+		```
+		"""
+		if self.is_closed:
+			raise RuntimeError(f'Cannot append to table {self.path_to_table} because it was already closed.')
+		if row is not None:
+			columns = {**row, **columns}
+		self._buffer[self._n_rows_in_buffer] = tuple(columns[column] for column in self._dtype.names)
+		self._n_rows_in_buffer += 1
+		if self._n_rows_in_buffer == len(self._buffer):
+			self.flush()
+
+	def append_columns(self, **columns):
+		"""Appends many rows at once, given as one array (or list) per
+		column, all of the same length. This is much faster than calling
+		`append` many times. Usage example:
+		```
+		table.append_columns(n_measurement=[1,2,3], voltage=[3.3,3.4,3.5])
+		```
+		"""
+		import numpy
+		if self.is_closed:
+			raise RuntimeError(f'Cannot append to table {self.path_to_table} because it was already closed.')
+		columns = {column: numpy.asarray(columns[column]) for column in self._dtype.names}
+		lengths = {len(values) for values in columns.values()}
+		if len(lengths) != 1:
+			raise ValueError(f'All columns must have the same length, received lengths {lengths}.')
+		n_rows = lengths.pop()
+		n_rows_done = 0
+		while n_rows_done < n_rows:
+			n = min(n_rows - n_rows_done, len(self._buffer) - self._n_rows_in_buffer)
+			for column,values in columns.items():
+				self._buffer[column][self._n_rows_in_buffer:self._n_rows_in_buffer+n] = values[n_rows_done:n_rows_done+n]
+			self._n_rows_in_buffer += n
+			n_rows_done += n
+			if self._n_rows_in_buffer == len(self._buffer):
+				self.flush()
+
+	def flush(self):
+		"""Writes the rows in the buffer, if any, into a new chunk and
+		updates the manifest."""
+		import numpy
+		if self._n_rows_in_buffer == 0:
+			return
+		chunk_name = f'chunk_{len(self._manifest["chunks"]):08d}.npy'
+		path_to_temporary_file = self.path_to_table/f'{chunk_name}.tmp'
+		with open(path_to_temporary_file, 'wb') as ofile:
+			numpy.save(ofile, self._buffer[:self._n_rows_in_buffer])
+		os.replace(path_to_temporary_file, self.path_to_table/chunk_name)
+		self._manifest['chunks'].append({'file_name': chunk_name, 'n_rows': self._n_rows_in_buffer})
+		self._manifest['n_rows'] += self._n_rows_in_buffer
+		self._n_rows_in_buffer = 0
+		_write_json_atomically(self._manifest, self.path_to_table/MANIFEST_FILE_NAME)
+
+	def close(self):
+		"""Flushes the remaining rows and marks the table as finalized."""
+		if self.is_closed:
+			return
+		self.flush()
+		self._manifest['finalized'] = True
+		_write_json_atomically(self._manifest, self.path_to_table/MANIFEST_FILE_NAME)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		self.close()
+
+class TableReader:
+	def __init__(self, path_to_table:Path):
+		"""Create a `TableReader` to read a table written by a `TableWriter`.
+		Only the chunks listed in the manifest are read, so this also
+		works with tables that are still being written or whose writer
+		crashed. Usually you don't create this yourself but through
+		`RunBureaucrat.read_table`.
+
+		Arguments
+		---------
+		path_to_table: Path
+			Path to the directory of the table.
+		"""
+		self._path_to_table = Path(path_to_table)
+		if not (self._path_to_table/MANIFEST_FILE_NAME).is_file():
+			raise FileNotFoundError(f'There is no table in {self._path_to_table}.')
+
+	@property
+	def path_to_table(self)->Path:
+		"""Returns a `Path` pointing to the directory of the table."""
+		return self._path_to_table
+
+	@property
+	def manifest(self)->dict:
+		"""Returns the current content of the manifest of the table."""
+		with open(self.path_to_table/MANIFEST_FILE_NAME, 'r') as ifile:
+			return json.load(ifile)
+
+	@property
+	def is_finalized(self)->bool:
+		"""Returns `True` if the table was properly closed, `False` if it
+		is still being written or if the writer crashed."""
+		return self.manifest['finalized']
+
+	@property
+	def n_rows(self)->int:
+		"""Returns the number of rows that can be read."""
+		return self.manifest['n_rows']
+
+	@property
+	def columns(self)->list:
+		"""Returns a list with the names of the columns."""
+		return [column for column,_ in self.manifest['schema']]
+
+	def iter_chunks(self, mmap:bool=True):
+		"""Yields the chunks one by one, as numpy structured arrays. If
+		`mmap` is `True` the chunks are memory mapped instead of being
+		loaded, so nothing is actually read until it is used."""
+		import numpy
+		for chunk in self.manifest['chunks']:
+			yield numpy.load(self.path_to_table/chunk['file_name'], mmap_mode='r' if mmap else None)
+
+	def read(self):
+		"""Reads the whole table and returns it as a numpy structured array."""
+		import numpy
+		manifest = self.manifest
+		chunks = [numpy.load(self.path_to_table/chunk['file_name']) for chunk in manifest['chunks']]
+		if len(chunks) == 0:
+			return numpy.empty(0, dtype=[(column, dtype) for column,dtype in manifest['schema']])
+		return numpy.concatenate(chunks)
+
+	def to_pandas(self):
+		"""Reads the whole table and returns it as a `pandas.DataFrame`."""
+		import pandas
+		return pandas.DataFrame(self.read())
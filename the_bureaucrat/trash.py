@@ -0,0 +1,121 @@
+from pathlib import Path
+import threading
+import atexit
+import shutil
+import queue
+import uuid
+import stat
+import os
+
+TRASH_DIRECTORY_NAME = '.bureaucrat_trash'
+
+_pending_deletions = queue.Queue()
+_deleting_thread = None
+_deleting_thread_lock = threading.Lock()
+
+def make_writable_and_retry(function, path, exc_info):
+	"""To be used as the `onerror` of `shutil.rmtree`. On Windows read only
+	files, like the scripts in the store of `the_bureaucrat`, cannot be
+	deleted, so they are made writable and deleted again. Other errors
+	are raised, except that the thing was already deleted by someone else."""
+	if exc_info is not None and isinstance(exc_info[1], FileNotFoundError):
+		return
+	os.chmod(path, stat.S_IWRITE)
+	function(path)
+
+def _delete_forever(p:Path):
+	if p.is_dir() and not p.is_symlink():
+		try:
+			shutil.rmtree(p, onerror=make_writable_and_retry)
+		except OSError: # Whatever is left stays in the trash, see `empty_trash_in`.
+			pass
+	else:
+		try:
+			p.unlink()
+		except FileNotFoundError:
+			pass
+		except PermissionError:
+			try:
+				make_writable_and_retry(os.unlink, p, None)
+			except OSError:
+				pass
+
+def _keep_deleting():
+	while True:
+		p = _pending_deletions.get()
+		try:
+			_delete_forever(p)
+		finally:
+			_pending_deletions.task_done()
+
+def move_to_trash(p:Path)->Path:
+	"""Moves `p` (a file or a directory) into a trash directory located
+	next to it, which is on the same file system, so this is an atomic
+	rename that takes the same time regardless of how much stuff is in `p`.
+
+	Arguments
+	---------
+	p: Path
+		The path to move to the trash.
+
+	Returns
+	-------
+	path_in_trash: Path
+		The new location of `p`, within the trash.
+	"""
+	p = Path(p)
+	path_to_trash = p.parent/TRASH_DIRECTORY_NAME
+	path_in_trash = path_to_trash/f'{p.name}.{os.getpid()}.{uuid.uuid4().hex}'
+	for n_attempt in range(3):
+		path_to_trash.mkdir(exist_ok=True)
+		try:
+			os.rename(p, path_in_trash)
+			return path_in_trash
+		except FileNotFoundError:
+			if not p.exists() or n_attempt == 2:
+				raise
+			# Else, the empty trash was removed by `empty_trash_in` in between, try again.
+
+def delete_in_background(p:Path):
+	"""Moves `p` to the trash (see `move_to_trash`) and deletes it in a
+	background thread, so this function returns immediately. Before
+	the interpreter exits it will wait for all pending deletions to
+	finish, see also `wait_for_pending_deletions`."""
+	global _deleting_thread
+	path_in_trash = move_to_trash(p)
+	with _deleting_thread_lock:
+		if _deleting_thread is None:
+			_deleting_thread = threading.Thread(target=_keep_deleting, name='bureaucrat_trash_deleter', daemon=True)
+			_deleting_thread.start()
+	_pending_deletions.put(path_in_trash)
+
+def wait_for_pending_deletions():
+	"""Blocks until all the deletions requested with `delete_in_background`
+	have finished. This is automatically called when the interpreter exits."""
+	if _deleting_thread is not None:
+		_pending_deletions.join()
+
+atexit.register(wait_for_pending_deletions)
+
+def empty_trash_in(directory:Path)->int:
+	"""Deletes the contents of the trash directory within `directory`, if
+	any. This is useful to get rid of things left in the trash by processes
+	that crashed before finishing the deletion.
+
+	Returns
+	-------
+	n_deleted: int
+		The number of things that were deleted from the trash.
+	"""
+	path_to_trash = Path(directory)/TRASH_DIRECTORY_NAME
+	try:
+		things_in_trash = list(path_to_trash.iterdir())
+	except FileNotFoundError:
+		return 0
+	for p in things_in_trash:
+		_delete_forever(p)
+	try:
+		path_to_trash.rmdir()
+	except OSError:
+		pass
+	return len(things_in_trash)